@@ -1,14 +1,14 @@
-import math
+from collections import OrderedDict
 import numpy as np
-import pandas as pd
 import inspect
+import queue
+import threading
 from customtkinter import *
-from PIL import Image
 
 from src.ui import *
 from src.umo import UMO
-from src.widgets.table import Tableview
-from src.widgets.plot import Plotview
+from src.expr import expression
+from src.autodiff import derivative
 
 
 class Appumo(CTk):
@@ -23,9 +23,16 @@ class Appumo(CTk):
         -. appumo.switchColormap()
         -. appumo.recover()
         -. ...
-        2. appumo.solve() | appumo.solveIgnored()   # для solve бажано використовувати try except
+        2. appumo.solve() | appumo.solveIgnored() | appumo.cancel() | appumo.race(methods: tuple = None, stop: bool = False) | appumo.raceIgnored()   # для solve, race бажано використовувати try except
         3. appumo.mainloop()
     '''
+    
+    POLL = 50  # період опитування фонового розв'язку, мс
+    DEBOUNCE = 80  # затримка перемальовування графіку після руху слайдера, мс
+    RESOLUTIONS = (25, 400)  # кількість вузлів сітки графіку по кожній осі: груба (одразу) -> точна (у фоні)
+    TILES = 8  # кількість смуг, на які ділиться точна сітка для фонового обчислення
+    SURFACES = 32  # кількість сіток у кеші
+    
     def __init__(self, umo:UMO, ui:UI=UI()):
         '''
         **GUI - Багатовимірна Безумовна Оптимізація**
@@ -38,14 +45,25 @@ class Appumo(CTk):
             -. appumo.switchColormap()
             -. appumo.recover()
             -. ...
-            2. appumo.solve() | appumo.solveIgnored()   # для solve бажано використовувати try except
+            2. appumo.solve() | appumo.solveIgnored() | appumo.cancel() | appumo.race(methods: tuple = None, stop: bool = False) | appumo.raceIgnored()   # для solve, race бажано використовувати try except
             3. appumo.mainloop()
+        
+        solve розв'язує задачу у фоновому потоці: ітерації (номер, f, ‖∇f‖) виводяться під час розв'язку
+        через опитування after(), а cancel зупиняє розв'язок після поточної ітерації.
+        race так само виконує перегони у фоновому потоці, а таблиця порівняння виводиться після їх завершення.
         '''
         super().__init__()
         self.umo = umo
         self.ui = ui
         self.tableveiw = None
         self.plotview = None
+        self._worker = None
+        self._states = None
+        self._stop = None
+        self._replot = None
+        self._surfaces = OrderedDict()
+        self._refining = None
+        self._pool = None
         self.title('Багатовимірна безумовна оптимізація')
         self.minsize(1000, 625)
         self.rowconfigure(1, weight=1)
@@ -63,49 +81,33 @@ class Appumo(CTk):
     def recover(self):
         '''Відновлення додатку'''
         self.umo.fun = callexec('Function', self.Fun)
-        x, y, z = self._axes()
-        self.plotview.plot(x, y, z)
+        self.umo.vectorized = True
+        self._surface()
         self.plotview.clear()
         self.tableveiw.clear()
     
     def _buildTitle(self):
         '''Будування Титульної форми'''
-        solve_png = Image.open('icons/solve.png')
-        recover_png = Image.open('icons/recover.png')
-        excel_png = Image.open('icons/excel.png')
-        theme_png = Image.open('icons/theme.png')
-        colormap_png = Image.open('icons/colormap.png')
-        
         self.frm_title = CTkFrame(master=self)
         self.frm_title.grid(row=0, column=0, sticky=EW, padx=40, pady=30)
         
           # іконка розв'язку
-        icon = CTkImage(dark_image=solve_png, light_image=solve_png, size=(22, 22))
-        btn = CTkButton(master=self.frm_title, command=self.solveIgnored, image=icon, text='', width=30, height=30)
-        btn.pack(side=LEFT)
-        btn.image = icon
+        CTkButton(master=self.frm_title, command=self.solveIgnored, image=icon('solve', (22, 22)), text='', width=30, height=30).pack(side=LEFT)
+          # зупинка розв'язку
+        self.btn_cancel = CTkButton(master=self.frm_title, command=self.cancel, text='✕', font=self.ui.FONT_HEADER(), width=30, height=30, state=DISABLED)
+        self.btn_cancel.pack(side=LEFT)
+          # перегони методів
+        CTkButton(master=self.frm_title, command=self.raceIgnored, text='⇶', font=self.ui.FONT_HEADER(), width=30, height=30).pack(side=LEFT)
           # іконка відновлення
-        icon = CTkImage(dark_image=recover_png, light_image=recover_png, size=(30, 30))
-        btn = CTkButton(master=self.frm_title, command=self.recover, image=icon, text='', width=30, height=30)
-        btn.pack(side=LEFT)
-        btn.image = icon
+        CTkButton(master=self.frm_title, command=self.recover, image=icon('recover', (30, 30)), text='', width=30, height=30).pack(side=LEFT)
           # іконка ексель файлу
-        icon = CTkImage(dark_image=excel_png, light_image=excel_png, size=(30, 30))
-        btn = CTkButton(master=self.frm_title, command=self.xlsx, image=icon, text='', width=30, height=30)
-        btn.pack(side=LEFT)
-        btn.image = icon
+        CTkButton(master=self.frm_title, command=self.xlsx, image=icon('excel', (30, 30)), text='', width=30, height=30).pack(side=LEFT)
           # заголовок
         CTkLabel(master=self.frm_title, text='БАГАТОВИМІРНА БЕЗУМОВНА ОПТИМІЗАЦІЯ', justify=CENTER, font=self.ui.FONT_TITLE()).pack(side=LEFT, fill=X, expand=True)
           # іконка теми
-        icon = CTkImage(dark_image=theme_png, light_image=theme_png, size=(30, 30))
-        btn = CTkButton(master=self.frm_title, command=self.switchTheme, image=icon, text='', width=30, height=30)
-        btn.pack(side=RIGHT)
-        btn.image = icon
+        CTkButton(master=self.frm_title, command=self.switchTheme, image=icon('theme', (30, 30)), text='', width=30, height=30).pack(side=RIGHT)
           # іконка кольорової-мапи
-        icon = CTkImage(dark_image=colormap_png, light_image=colormap_png, size=(20, 20))
-        btn = CTkButton(master=self.frm_title, command=self.switchColormap, image=icon, text='', width=30, height=30)
-        btn.pack(side=RIGHT)
-        btn.image = icon
+        CTkButton(master=self.frm_title, command=self.switchColormap, image=icon('colormap', (20, 20)), text='', width=30, height=30).pack(side=RIGHT)
     def _buildMain(self):
         '''Будування Головної форми'''
         self.frm_main = CTkFrame(master=self)
@@ -136,6 +138,7 @@ class Appumo(CTk):
         self.Grad = [StringVar(value=gradstr[0]), StringVar(value=gradstr[1])]
         self.Hesse = [[StringVar(value=hessestr[0]), StringVar(value=hessestr[1])], [StringVar(value=hessestr[2]), StringVar(value=hessestr[3])]]
         self.Eps = DoubleVar(value=self.umo.EPS)
+        self.Stats = StringVar(value='')
         
         self.Offset = (DoubleVar(value=.0), DoubleVar(value=.0), DoubleVar(value=.0))
         self.Scale = DoubleVar(value=5.)
@@ -176,11 +179,15 @@ class Appumo(CTk):
           # точність
         CTkLabel(master=self.frm_input, text='Точність:', anchor=E).grid(row=12, column=0, sticky=EW, padx=20, pady=30)
         CTkEntry(master=self.frm_input, textvariable=self.Eps, width=81).grid(row=12, column=1)
+          # обчислення
+        CTkLabel(master=self.frm_input, text='Обчислення:', anchor=E).grid(row=13, column=0, sticky=NE, padx=20)
+        CTkLabel(master=self.frm_input, textvariable=self.Stats, anchor=W, justify=LEFT).grid(row=13, column=1, columnspan=2, sticky=EW)
     def _buildTable(self):
         '''Будування форми для Таблиці'''
+        from src.widgets.table import Tableview
+        
         def on_iter_changed(it):
-            self.plotview.route(path=list(self.umo.table.T.to_dict().values()), curloc=it, is_init=False)
-            self.plotview.draw()
+            self.plotview.route(curloc=self.tableveiw.Iter.get(), is_init=False)
         
         self.frm_table = CTkFrame(master=self.frm_main)
         self.frm_table.grid(row=0, column=2, sticky=NW)
@@ -193,9 +200,15 @@ class Appumo(CTk):
         self.tableveiw.grid(row=1, column=0, sticky=NSEW)
     def _buildPlot(self, tab:str=None):
         '''Будування форми для Графіку'''
+        from src.widgets.plot import Plotview
+        
         def on_plot_resize(_):
-            x, y, z = self._axes()
-            self.plotview.plot(x, y, z)
+              # події слайдера об'єднуються: графік перемальовується один раз після паузи DEBOUNCE
+            if self._replot: self.after_cancel(self._replot)
+            self._replot = self.after(self.DEBOUNCE, replot)
+        def replot():
+            self._replot = None
+            self._surface()
         
         self.frm_plot = CTkFrame(master=self.frm_main)
         self.frm_plot.grid(row=0, column=1, sticky=NSEW)
@@ -203,11 +216,12 @@ class Appumo(CTk):
         self.frm_plot.columnconfigure(0, weight=1)
         self.frm_plot.rowconfigure(3, minsize=10)
         
-          # дані
-        x, y, z = self._axes()
+          # дані (груба сітка, точна - у фоні)
+        x, y, z = self._axes(self.RESOLUTIONS[0])
           # фабула з вкладками
         self.plotview = Plotview(master=self.frm_plot, ui=self.ui, x=x, y=y, z=z, tabset=tab)
         self.plotview.grid(row=0, column=0, sticky=NSEW)
+        self._surface()
           # слайдери
         CTkSlider(self.frm_plot, command=on_plot_resize, from_=-20., to=20., number_of_steps=40, variable=self.Offset[0], orientation=HORIZONTAL, height=10).grid(row=1, column=0, pady=4)
         CTkSlider(self.frm_plot, command=on_plot_resize, from_=-20., to=20., number_of_steps=40, variable=self.Offset[1], orientation=VERTICAL, width=10).grid(row=0, column=1, padx=4)
@@ -215,60 +229,200 @@ class Appumo(CTk):
         CTkSlider(self.frm_plot, command=on_plot_resize, from_=10., to=.5, number_of_steps=20, variable=self.Scale, orientation=HORIZONTAL, height=10).grid(row=2, column=0, pady=4)
     
     def solve(self, method:str=None):
-        '''Розрахунок задачі'''
+        '''Розрахунок задачі (у фоновому потоці)'''
+        if self._worker: raise Exception('? Appumo.solve: the previous solve is still running')
         if not method: method = self.Method.get()
         if method not in UMO.METHODS: raise Exception(f'? Appumo.solve: unknown method "{method}"')
         else: self.Method.set(method)
         
           # підготовка даних
-        try:
-            self.umo.x = tuple(x.get() for x in self.X)
-            self.umo.fun = callexec('Function', self.Fun)
-            self.umo.grad = callexec('Gradient', self.Grad)
-            self.umo.hesse = callexec('Hesse', self.Hesse)
-            try: self.umo.EPS = self.Eps.get()
-            except Exception: raise Exception('[Epsilon]')
+        try: self._prepare()
         except Exception as exc:
             raise Exception(f'? Appumo.solve: incorrect input in {exc}')
-          # розв'язок
-        try:
-            self.umo.solve(method)
-        except Exception as exc:
-            raise Exception(f'! Appumo.solve: umo.solve: {exc}')
-          # виведення результату
-        x, y, z = self._axes()
-        self.umo.displayResult()
-        self.tableveiw.panda(self.umo.table)
-        self.plotview.plot(x, y, z)
-        self.plotview.route(path=list(self.umo.table.T.to_dict().values()))
-        self.plotview.draw()
+          # розв'язок: стани ітерацій передаються в чергу, результат (або виняток) - останнім
+        def work():
+            try:
+                self.umo.solve(method, stop=self._stop, callback=self._states.put)
+                self._states.put(None)
+            except Exception as exc:
+                self._states.put(exc)
+        self._surface()
+        self.plotview.clear()
+        self.tableveiw.clear()
+        self.Stats.set('')
+        self._states = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=work, daemon=True)
+        self._worker.start()
+        self.btn_cancel.configure(state=NORMAL)
+        self.after(self.POLL, self._poll)
+    def cancel(self):
+        '''Зупинка розрахунку задачі'''
+        if self._stop: self._stop.set()
     def solveIgnored(self):
         '''Безпечний розрахунок задачі'''
         try: self.solve()
         except Exception as exc:
           print(exc)
           self._warning(exc)
+    def race(self, methods:tuple=None, stop:bool=False):
+        '''Перегони методів (одночасний розрахунок задачі) і таблиця порівняння'''
+        if self._worker: raise Exception('? Appumo.race: the previous solve is still running')
+        if methods and any(method not in UMO.METHODS for method in methods): raise Exception(f'? Appumo.race: unknown method in {methods}')
+        
+          # підготовка даних
+        try: self._prepare()
+        except Exception as exc:
+            raise Exception(f'? Appumo.race: incorrect input in {exc}')
+          # розв'язок у фоновому потоці: таблиця порівняння (або виняток) передається в чергу
+        def work():
+            try: self._states.put(self.umo.race(methods, stop=stop))
+            except Exception as exc:
+                self._states.put(exc)
+        self.plotview.clear()
+        self.tableveiw.clear()
+        self.Stats.set('перегони...')
+        self._states = queue.SimpleQueue()
+        self._worker = threading.Thread(target=work, daemon=True)
+        self._worker.start()
+        self.after(self.POLL, self._pollRace)
+    def raceIgnored(self):
+        '''Безпечні перегони методів'''
+        try: self.race()
+        except Exception as exc:
+          print(exc)
+          self._warning(exc)
+    
+    def _poll(self):
+        '''Опитування фонового розв'язку: виведення нових ітерацій і результату'''
+        states, finished = [], False
+        while not self._states.empty():
+            state = self._states.get()
+            if isinstance(state, dict): states.append(state)
+            else: finished, error = True, state
+        if states: self._progress(states)
+        if not finished:
+            self.after(self.POLL, self._poll)
+            return
+        self._worker = None
+        self._stop = None
+        self.btn_cancel.configure(state=DISABLED)
+        if error:
+            print(f'! Appumo.solve: umo.solve: {error}')
+            self._warning(Exception(f'! Appumo.solve: umo.solve: {error}'))
+            return
+          # виведення результату
+        self.umo.displayResult()
+        self.Stats.set(statstr(self.umo.result) + ('\nзупинено' if self.umo.stopped else ''))
+        self.tableveiw.panda(self.umo.table)
+        self.plotview.route(path=self.tableveiw.iterations)
+    def _pollRace(self):
+        '''Опитування фонових перегонів: виведення таблиці порівняння'''
+        if self._states.empty():
+            self.after(self.POLL, self._pollRace)
+            return
+        report = self._states.get()
+        self._worker = None
+        if isinstance(report, Exception):
+            print(f'! Appumo.race: umo.race: {report}')
+            self._warning(Exception(f'! Appumo.race: umo.race: {report}'))
+            self.Stats.set('')
+            return
+          # виведення результату
+        import pandas as pd
+        best = min(report, key=lambda row: row['fun'])
+        self.Stats.set(f"переможець: {best['method']}\nf: {best['fun']:.6f}   час: {1e3 * best['wall']:.1f} мс")
+        self.tableveiw.report(pd.DataFrame(report))
+    def _progress(self, states:list):
+        '''Виведення нових ітерацій під час розв'язку'''
+        self.plotview.stream(states)
+        state = states[-1]
+        progress = f"ітерація: {state['nit']}\nf: {state['fun']:.6f}"
+        if 'gnorm' in state: progress += f"   ‖∇f‖: {state['gnorm']:.3e}"
+        self.Stats.set(progress)
+    
+    def _prepare(self):
+        '''Передача даних з полів введення в UMO'''
+        self.umo.x = tuple(x.get() for x in self.X)
+        self.umo.fun = callexec('Function', self.Fun)
+        self.umo.grad = callexec('Gradient', self.Grad, fun=self.umo.fun)
+        self.umo.hesse = callexec('Hesse', self.Hesse, fun=self.umo.fun)
+        self.umo.vectorized = True
+        try: self.umo.EPS = self.Eps.get()
+        except Exception: raise Exception('[Epsilon]')
     
     def xlsx(self, path:str=None):
         '''Створення ексель-файлу із інформацією ітерацій'''
+        import pandas as pd
         if not path: path = f'Appumo - {self.Method.get()}'
         writer = pd.ExcelWriter(f'{path}.xlsx')
         self.umo.table.to_excel(writer, sheet_name=self.Method.get())
         writer._save()
     
-    def _axes(self) -> tuple:
-        '''Значення X, Y, Z'''
-        offset = (self.Offset[0].get(), self.Offset[1].get(), self.Offset[2].get())
+    def _axes(self, resolution:int=None) -> tuple:
+        '''Значення X, Y, Z (сітка з кешу або обчислена одразу)'''
+        key = self._key(resolution if resolution else self.RESOLUTIONS[-1])
+        if key in self._surfaces: self._surfaces.move_to_end(key)
+        else: self._cache(key, surface(*key))
+        return self._clip(self._surfaces[key])
+    def _key(self, resolution:int) -> tuple:
+        '''Ключ сітки в кеші: функція, вікно по x, y (без z) і роздільність'''
+        return (self.umo.fun, self.umo.vectorized, self.Offset[0].get(), self.Offset[1].get(), self.Scale.get(), resolution)
+    def _cache(self, key:tuple, xyz:tuple):
+        '''Збереження сітки в кеші (найдавніше використана витісняється)'''
+        self._surfaces[key] = xyz
+        if len(self._surfaces) > self.SURFACES: self._surfaces.popitem(last=False)
+    def _clip(self, xyz:tuple) -> tuple:
+        '''Обрізання значень Z вікном по z (зміщення по z не потребує нових обчислень)'''
+        x, y, z = xyz
         scale = self.Scale.get()
-        xmin, xmax = offset[0] - scale, offset[0] + scale
-        ymin, ymax = offset[1] - scale, offset[1] + scale
-        zmin, zmax = offset[2] - 5 * scale, offset[2] + 5 * scale
-        x = np.arange(xmin, xmax, abs(xmax - xmin) / 100)
-        y = np.arange(ymin, ymax, abs(xmax - xmin) / 100)
-        x, y = np.meshgrid(x, y)
-        z = np.array([self.umo.fun([xi, yi]) for (xi, yi) in zip(x, y)])
-        z = np.where((z < zmin) | (z > zmax), np.nan, z)
-        return x, y, z
+        zmin, zmax = self.Offset[2].get() - 5 * scale, self.Offset[2].get() + 5 * scale
+        return x, y, np.where((z < zmin) | (z > zmax), np.nan, z)
+    def _surface(self):
+        '''Малювання графіку: груба сітка - одразу, точна - смугами у фоновому пулі потоків'''
+        if self._refining:
+            for _, future in self._refining[-1]: future.cancel()
+            self._refining = None
+        key = self._key(self.RESOLUTIONS[-1])
+        if key in self._surfaces:
+            self.plotview.plot(*self._axes())
+            return
+        x, y, z = self._axes(self.RESOLUTIONS[0])
+        self.plotview.plot(x, y, z)
+          # точна сітка: спочатку - збільшена груба, смуги замінюються в міру обчислення
+        n = self.RESOLUTIONS[-1]
+        coarse = self._surfaces[self._key(self.RESOLUTIONS[0])][2]
+        index = np.arange(n) * len(coarse) // n
+        x, y = grid(*key[2:])
+        z = coarse[np.ix_(index, index)].copy()
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(thread_name_prefix='surface')
+        bands = np.linspace(0, n, self.TILES + 1).astype(int)
+        futures = [(slice(a, b), self._pool.submit(values, key[0], key[1], x[a:b], y[a:b])) for a, b in zip(bands[:-1], bands[1:])]
+        self._refining = (key, x, y, z, futures)
+        self.after(self.POLL, self._refine, self._refining)
+    def _refine(self, refining:tuple):
+        '''Заміна готових смуг точної сітки на графіку (опитування фонового пулу)'''
+        if refining is not self._refining: return
+        key, x, y, z, futures = refining
+        done = [(rows, future) for rows, future in futures if future.done()]
+        if not done:
+            self.after(self.POLL, self._refine, refining)
+            return
+        try:
+            for rows, future in done: z[rows] = future.result()
+        except Exception as exc:
+            print(f'! Appumo._refine: {exc}')
+            self._refining = None
+            return
+        futures[:] = [item for item in futures if item not in done]
+        if futures: self.after(self.POLL, self._refine, refining)
+        else:
+            self._refining = None
+            for a in (x, y, z): a.flags.writeable = False
+            self._cache(key, (x, y, z))
+        self.plotview.plot(*self._clip((x, y, z)))
     
     def switchTheme(self, theme:Theme=None, is_init:bool=False):
         '''Перемикання теми (Темна <-> Світла)'''
@@ -285,7 +439,6 @@ class Appumo(CTk):
     def _warning(self, exception:Exception):
         '''Попередження про помилку'''
         message = f'{exception}'.replace(':', ':\n')
-        warning_png = Image.open('icons/warning_y.png' if message[0] == '?' else 'icons/warning_r.png')
         
         warning = CTkToplevel(master=self)
         warning.minsize(200, 175)
@@ -296,41 +449,59 @@ class Appumo(CTk):
             warning.update()
         
           # іконка розв'язку
-        icon = CTkImage(dark_image=warning_png, light_image=warning_png, size=(75, 75))
-        btn = CTkButton(master=warning, command=close, image=icon, text='', width=75, height=75)
-        btn.pack(pady=15)
-        btn.image = icon
+        CTkButton(master=warning, command=close, image=icon('warning_y' if message[0] == '?' else 'warning_r', (75, 75)), text='', width=75, height=75).pack(pady=15)
           # повідомлення
         CTkLabel(master=warning, text=message, font=self.ui.FONT_WARNING(), text_color=self.ui.FONT_COLOR()).pack(side=LEFT, expand=True, padx=15)
         
         warning.after(100, warning.focus_force)
 
 
-def callexec(what:str, line:str|list) -> callable:
-    namespace = {
-        'sqrt':math.sqrt, 'abs':abs,
-        'sin':math.sin, 'cos':math.cos, 'tan':math.tan,
-        'asin':math.asin, 'acos':math.acos, 'atan':math.atan,
-        'log':math.log, 'log10':math.log10, 'log2':math.log2,
-        'exp':math.exp, 'np':np
-    }
+def statstr(result:dict) -> str:
+    '''Лічильники обчислень і час розв'язку для виведення'''
+    wall = {phase:1e3 * wall for phase, (wall, _) in result['phases'].items()}
+    return (f"ітерацій: {result['nit']}\n"
+            f"f: {result['nfev']}   ∇f: {result['ngev']}   ∇²f: {result['nhev']}\n"
+            f"час: {1e3 * result['wall']:.1f} мс (cpu {1e3 * result['cpu']:.1f} мс)\n"
+            f"функції: {wall['fun'] + wall['grad'] + wall['hesse']:.1f} мс   пошук: {wall['linesearch']:.1f} мс   алгебра: {wall['linalg']:.1f} мс")
+
+
+def grid(x0:float, y0:float, scale:float, resolution:int) -> tuple:
+    '''Сітка X, Y (resolution x resolution) у квадраті з центром (x0, y0) і півстороною scale'''
+    return np.meshgrid(np.linspace(x0 - scale, x0 + scale, resolution), np.linspace(y0 - scale, y0 + scale, resolution))
+
+
+def surface(fun:callable, vectorized:bool, x0:float, y0:float, scale:float, resolution:int) -> tuple:
+    '''Сітка X, Y і значення Z функції (лише для читання)'''
+    x, y = grid(x0, y0, scale, resolution)
+    z = values(fun, vectorized, x, y)
+    for a in (x, y, z): a.flags.writeable = False
+    return x, y, z
+
+
+def values(fun:callable, vectorized:bool, x:np.ndarray, y:np.ndarray) -> np.ndarray:
+    '''Значення Z функції на сітці X, Y (або на смузі її рядків)'''
+    if vectorized: return np.asarray(fun(np.stack((x, y), axis=-1)), dtype=float)
+    return np.array([fun([xi, yi]) for (xi, yi) in zip(x, y)], dtype=float)
+
+
+def callexec(what:str, line:StringVar|list, fun:callable=None) -> callable:
+    '''
+    Векторизована функція за виразом із полів введення
+    
+    Якщо поля градієнту (Гессе) порожні, а fun задано, то похідна обчислюється автоматичним диференціюванням fun.
+    '''
     match what:
         case 'Function':
             call = line.get()
             if not call: raise Exception('[Function]')
-            ckey = '_FUNC'
-            call = 'def ' + ckey + '(x) -> float: return ' + call
         case 'Gradient':
             call = (line[0].get(), line[1].get())
+            if fun and not any(call): return derivative(what, fun)
             if not call[0] or not call[1]: raise Exception('[Gradient]')
-            ckey = '_GRAD'
-            call = 'def ' + ckey + '(x) -> np.ndarray: return np.array([' + call[0] + ', ' + call[1] + '])'
         case 'Hesse':
-            call = (line[0][0].get(), line[0][1].get(), line[1][0].get(), line[1][1].get())
-            if not call[0] or not call[1] or not call[2] or not call[3]: raise Exception('[Hesse]')
-            ckey = '_HESSE'
-            call = 'def ' + ckey + '(x) -> np.ndarray: return np.array([[' + call[0] + ', ' + call[1] + '], [' + call[2] + ', ' + call[3] + ']])'
+            call = ((line[0][0].get(), line[0][1].get()), (line[1][0].get(), line[1][1].get()))
+            if fun and not any(c for row in call for c in row): return derivative(what, fun)
+            if not all(c for row in call for c in row): raise Exception('[Hesse]')
         case _:
             raise Exception('[?]')
-    exec(call, namespace)
-    return namespace[ckey]
+    return expression(what, call)
@@ -0,0 +1,163 @@
+from functools import lru_cache
+import numpy as np
+
+from src.expr import Expression, expression
+
+
+class Dual:
+    '''
+    **Dual** - *Гіпер-дуальне число для автоматичного диференціювання (прямий режим)*
+
+    Зберігає значення val (...), градієнт grad (n, ...) і, за потреби, матрицю Гессе hess (n, n, ...).
+    Підтримує арифметику Python та універсальні функції NumPy (sqrt, sin, exp, ...),
+    тому вирази Expression обчислюються на Dual без змін.
+    '''
+    __array_priority__ = 100
+
+    def __init__(self, val, grad, hess=None):
+        self.val = val
+        self.grad = grad
+        self.hess = hess
+
+    def _chain(self, f, df, d2f) -> 'Dual':
+        '''Ланцюгове правило для g(u): g'(u) ∇u, g'(u) ∇²u + g''(u) ∇u ∇uᵀ'''
+        grad = df * self.grad
+        hess = None if self.hess is None else df * self.hess + d2f * _outer(self.grad, self.grad)
+        return Dual(f, grad, hess)
+
+    def __add__(self, other):
+        if not isinstance(other, Dual): return Dual(self.val + other, self.grad, self.hess)
+        hess = None if self.hess is None else self.hess + other.hess
+        return Dual(self.val + other.val, self.grad + other.grad, hess)
+    def __sub__(self, other):
+        return self + (-other)
+    def __mul__(self, other):
+        if not isinstance(other, Dual):
+            return Dual(self.val * other, self.grad * other, None if self.hess is None else self.hess * other)
+        grad = self.val * other.grad + other.val * self.grad
+        hess = None
+        if self.hess is not None:
+            hess = self.val * other.hess + other.val * self.hess + _outer(self.grad, other.grad) + _outer(other.grad, self.grad)
+        return Dual(self.val * other.val, grad, hess)
+    def __truediv__(self, other):
+        if not isinstance(other, Dual): return self * (1. / other)
+        return self * other._reciprocal()
+    def __pow__(self, other):
+        if isinstance(other, Dual): return np.exp(other * np.log(self))
+        if other == 0: return Dual(np.ones_like(self.val), 0. * self.grad, None if self.hess is None else 0. * self.hess)
+        return self._chain(self.val ** other, other * self.val ** (other - 1), other * (other - 1) * self.val ** (other - 2))
+    def __radd__(self, other):
+        return self + other
+    def __rsub__(self, other):
+        return (-self) + other
+    def __rmul__(self, other):
+        return self * other
+    def __rtruediv__(self, other):
+        return self._reciprocal() * other
+    def __rpow__(self, other):
+        f = other ** self.val
+        ln = np.log(other)
+        return self._chain(f, ln * f, ln * ln * f)
+    def __neg__(self):
+        return Dual(-self.val, -self.grad, None if self.hess is None else -self.hess)
+    def __pos__(self):
+        return self
+    def __abs__(self):
+        sign = np.sign(self.val)
+        return self._chain(np.abs(self.val), sign, 0. * sign)
+
+    def _reciprocal(self) -> 'Dual':
+        return self._chain(1. / self.val, -1. / self.val ** 2, 2. / self.val ** 3)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs: return NotImplemented
+        if ufunc in _BINARY:
+            return getattr(inputs[0] if isinstance(inputs[0], Dual) else Dual(inputs[0], 0. * inputs[1].grad, None if inputs[1].hess is None else 0. * inputs[1].hess), _BINARY[ufunc])(inputs[1])
+        if ufunc in _UNARY:
+            return _UNARY[ufunc](inputs[0])
+        return NotImplemented
+
+
+def _outer(a, b):
+    '''Зовнішній добуток градієнтів (n, ...) x (n, ...) -> (n, n, ...)'''
+    return a[:, np.newaxis] * b[np.newaxis, :]
+
+def _unary(f, df, d2f) -> callable:
+    return lambda u: u._chain(f(u.val), df(u.val), d2f(u.val))
+
+
+_BINARY = {
+    np.add:'__add__', np.subtract:'__sub__',
+    np.multiply:'__mul__', np.true_divide:'__truediv__',
+    np.power:'__pow__'
+}
+_UNARY = {
+    np.negative:Dual.__neg__, np.positive:Dual.__pos__, np.absolute:Dual.__abs__,
+    np.sqrt:_unary(np.sqrt, lambda v: .5 / np.sqrt(v), lambda v: -.25 / v ** 1.5),
+    np.sin:_unary(np.sin, np.cos, lambda v: -np.sin(v)),
+    np.cos:_unary(np.cos, lambda v: -np.sin(v), lambda v: -np.cos(v)),
+    np.tan:_unary(np.tan, lambda v: 1. / np.cos(v) ** 2, lambda v: 2. * np.tan(v) / np.cos(v) ** 2),
+    np.arcsin:_unary(np.arcsin, lambda v: 1. / np.sqrt(1. - v * v), lambda v: v / (1. - v * v) ** 1.5),
+    np.arccos:_unary(np.arccos, lambda v: -1. / np.sqrt(1. - v * v), lambda v: -v / (1. - v * v) ** 1.5),
+    np.arctan:_unary(np.arctan, lambda v: 1. / (1. + v * v), lambda v: -2. * v / (1. + v * v) ** 2),
+    np.exp:_unary(np.exp, np.exp, np.exp),
+    np.log:_unary(np.log, lambda v: 1. / v, lambda v: -1. / v ** 2),
+    np.log10:_unary(np.log10, lambda v: 1. / (v * np.log(10.)), lambda v: -1. / (v * v * np.log(10.))),
+    np.log2:_unary(np.log2, lambda v: 1. / (v * np.log(2.)), lambda v: -1. / (v * v * np.log(2.)))
+}
+
+
+def autodiff(fun:Expression, x, order:int=2) -> tuple:
+    '''
+    Значення, градієнт і (для order = 2) матриця Гессе виразу функції за один прохід
+
+        f, g = autodiff(fun, x, order=1)
+        f, g, H = autodiff(fun, x)   # x: (n,) | (..., n) -> (...), (..., n), (..., n, n)
+    '''
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    shape = x.shape[:-1]
+    xs = np.moveaxis(x, -1, 0)
+    seeds = []
+    for i in range(n):
+        grad = np.zeros((n,) + shape)
+        grad[i] = 1.
+        hess = np.zeros((n, n) + shape) if order > 1 else None
+        seeds.append(Dual(xs[i], grad, hess))
+    value = fun._call(seeds)
+    if not isinstance(value, Dual): value = Dual(value, np.zeros((n,) + shape), np.zeros((n, n) + shape) if order > 1 else None)
+    f = np.broadcast_to(value.val, shape).astype(float)
+    g = np.moveaxis(np.broadcast_to(value.grad, (n,) + shape), 0, -1).astype(float)
+    if order < 2: return f, g
+    H = np.moveaxis(np.broadcast_to(value.hess, (n, n) + shape), (0, 1), (-2, -1)).astype(float)
+    return f, g, H
+
+
+class Derivative:
+    '''
+    **Derivative** - *Градієнт або матриця Гессе виразу функції (автоматичне диференціювання)*
+
+    *Використання:*
+
+        1. grad = derivative('Gradient', fun: Expression) | hesse = derivative('Hesse', fun: Expression)
+        2. umo.grad = grad | umo.hesse = hesse
+    '''
+    def __init__(self, what:str, fun:Expression):
+        if what not in ('Gradient', 'Hesse'): raise Exception('[?]')
+        self.what = what
+        self.fun = fun
+
+    def __call__(self, x) -> np.ndarray:
+        if self.what == 'Gradient': return autodiff(self.fun, x, order=1)[1]
+        return autodiff(self.fun, x, order=2)[2]
+    def __reduce__(self):
+        return derivative, (self.what, self.fun)
+    def __repr__(self):
+        return f'Derivative({self.what!r}, {self.fun!r})'
+
+
+@lru_cache(maxsize=128)
+def derivative(what:str, fun:Expression|str) -> Derivative:
+    '''Похідна виразу функції (з кешу, якщо вираз не змінився)'''
+    if isinstance(fun, str): fun = expression('Function', fun)
+    return Derivative(what, fun)
@@ -0,0 +1,240 @@
+'''BENCH - Відтворюваний тест швидкодії методів UMO (без інтерфейсу)
+
+    python -m src.bench [--dims 2 10 100] [--methods ...] [--problems ...] [--linesearch quadratic wolfe] [--out results.json] [--baseline benchmarks/baseline.json] [--update] [--golden]
+'''
+
+from collections import namedtuple
+import argparse
+import ast
+import glob
+import json
+import math
+import sys
+import time
+import numpy as np
+
+from src.umo import UMO
+
+
+Problem = namedtuple('Problem', ('name', 'fun', 'grad', 'hesse', 'start', 'fmin', 'dims'))
+
+DIMS = (2, 10, 100, 1000, 10000)
+
+  # найбільша розмірність для методів з матрицями n x n (Гессе, BFGS, симплекс) і покоординатним пошуком
+LIMITS = {
+    'Хука-Дживса':100,
+    'Нелдера-Міда':1000,
+    'Нелдера-Міда (паралельний)':1000,
+    'Квазі-Ньютона (BFGS)':1000,
+    'Ньютона':1000
+}
+
+  # методи з лінійним пошуком: записуються для кожного лінійного пошуку
+SEARCHES = ('Найшвидшого спуску', 'Спряжених градієнтів', 'Квазі-Ньютона (BFGS)', 'Квазі-Ньютона (L-BFGS)', 'Ньютона-CG')
+
+TOLERANCE = 1e-4  # похибка, з якою розв'язок вважається збіжним
+
+BASELINE = 'benchmarks/baseline.json'
+
+COUNTS = ('nit', 'nfev', 'ngev', 'nhev')
+
+
+def _rosenbrock(X):
+    x = np.moveaxis(np.asarray(X, dtype=float), -1, 0)
+    return np.sum(100 * (x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2, axis=0)
+def _rosenbrockGrad(x):
+    g = np.zeros_like(x)
+    g[:-1] = -400 * x[:-1] * (x[1:] - x[:-1]**2) - 2 * (1 - x[:-1])
+    g[1:] += 200 * (x[1:] - x[:-1]**2)
+    return g
+def _rosenbrockHesse(x):
+    H = np.diag(-400 * x[:-1], 1)
+    H = H + H.T
+    d = np.zeros_like(x)
+    d[:-1] = 1200 * x[:-1]**2 - 400 * x[1:] + 2
+    d[1:] += 200
+    return H + np.diag(d)
+
+def _beale(X):
+    x, y = np.moveaxis(np.asarray(X, dtype=float), -1, 0)
+    return (1.5 - x + x * y)**2 + (2.25 - x + x * y**2)**2 + (2.625 - x + x * y**3)**2
+def _bealeTerms(v):
+    x, y = v
+    k = np.arange(1, 4)
+    a = np.array((1.5, 2.25, 2.625)) - x + x * y**k
+    da = np.stack((y**k - 1, k * x * y**(k - 1)))
+    return x, y, k, a, da
+def _bealeGrad(v):
+    _, _, _, a, da = _bealeTerms(v)
+    return 2 * da @ a
+def _bealeHesse(v):
+    x, y, k, a, da = _bealeTerms(v)
+    dxy, dyy = k * y**(k - 1), k * (k - 1) * x * y**np.maximum(k - 2, 0)
+    return 2 * (da @ da.T + np.array(((0., a @ dxy), (a @ dxy, a @ dyy))))
+
+def _himmelblau(X):
+    x, y = np.moveaxis(np.asarray(X, dtype=float), -1, 0)
+    return (x**2 + y - 11)**2 + (x + y**2 - 7)**2
+def _himmelblauGrad(v):
+    x, y = v
+    a, b = x**2 + y - 11, x + y**2 - 7
+    return np.array((4 * x * a + 2 * b, 2 * a + 4 * y * b))
+def _himmelblauHesse(v):
+    x, y = v
+    return np.array(((12 * x**2 + 4 * y - 42, 4 * x + 4 * y), (4 * x + 4 * y, 4 * x + 12 * y**2 - 26)))
+
+def _conditions(n:int) -> np.ndarray:
+    '''Власні значення квадратичної функції: від 1 до 10⁶'''
+    return 10. ** (6 * np.arange(n) / (n - 1))
+def _quadratic(X):
+    X = np.asarray(X, dtype=float)
+    return .5 * np.sum(_conditions(X.shape[-1]) * X**2, axis=-1)
+def _quadraticGrad(x):
+    return _conditions(len(x)) * x
+def _quadraticHesse(x):
+    return np.diag(_conditions(len(x)))
+
+def _rastrigin(X):
+    X = np.asarray(X, dtype=float)
+    return 10 * X.shape[-1] + np.sum(X**2 - 10 * np.cos(2 * np.pi * X), axis=-1)
+def _rastriginGrad(x):
+    return 2 * x + 20 * np.pi * np.sin(2 * np.pi * x)
+def _rastriginHesse(x):
+    return np.diag(2 + 40 * np.pi**2 * np.cos(2 * np.pi * x))
+
+def _main(X):
+    x, y = np.moveaxis(np.asarray(X, dtype=float), -1, 0)
+    return 5 * x**2 + 2 * y**2 + 4 * x * y + 4. * math.sqrt(5) * (x + y) - 14
+def _mainGrad(v):
+    x, y = v
+    return np.array([10 * x + 4 * y + 4 * math.sqrt(5), 4 * x + 4 * y + 4 * math.sqrt(5)])
+def _mainHesse(v):
+    return np.array([[10., 4.], [4., 4.]])
+
+
+PROBLEMS = {
+    'rosenbrock':Problem('rosenbrock', _rosenbrock, _rosenbrockGrad, _rosenbrockHesse, lambda n: np.resize((-1.2, 1.), n), .0, None),
+    'beale':Problem('beale', _beale, _bealeGrad, _bealeHesse, lambda n: np.ones(n), .0, (2,)),
+    'himmelblau':Problem('himmelblau', _himmelblau, _himmelblauGrad, _himmelblauHesse, lambda n: np.zeros(n), .0, (2,)),
+    'quadratic':Problem('quadratic', _quadratic, _quadraticGrad, _quadraticHesse, lambda n: np.ones(n), .0, None),
+    'rastrigin':Problem('rastrigin', _rastrigin, _rastriginGrad, _rastriginHesse, lambda n: np.full(n, .3), .0, None),
+    'main':Problem('main', _main, _mainGrad, _mainHesse, lambda n: np.zeros(n), -24., (2,))
+}
+
+
+def run(methods:tuple=None, problems:tuple=None, dims:tuple=DIMS, maxiter:int=1000, eps:float=1e-6, linesearches:tuple=UMO.LINESEARCHES, repeat:int=1, log=None) -> list:
+    '''
+    Розв'язки кожним методом кожної задачі кожної розмірності -> список записів (wall, nfev, ngev, nhev, nit, error, converged)
+
+    Методи SEARCHES розв'язують задачу з кожним лінійним пошуком linesearches, решта - один раз (linesearch = None).
+    converged - похибка не більша за TOLERANCE.
+    '''
+    records = []
+    for problem in (PROBLEMS[name] for name in (problems or PROBLEMS)):
+        for n in dims:
+            if problem.dims and n not in problem.dims: continue
+            for method in (methods or UMO.METHODS):
+                if n > LIMITS.get(method, n): continue
+                for linesearch in (linesearches if method in SEARCHES else (None,)):
+                    umo = UMO(problem.fun, problem.start(n), problem.grad, problem.hesse, eps=eps, maxiter=maxiter, vectorized=True, heavy=0, linesearch=linesearch or 'quadratic')
+                    wall = math.inf
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        result = umo.run(method).result
+                        wall = min(wall, time.perf_counter() - start)
+                    error = abs(result['fun'] - problem.fmin)
+                    record = {'problem':problem.name, 'n':n, 'method':method, 'linesearch':linesearch, 'wall':wall} | {key:result[key] for key in COUNTS} | {'error':error, 'converged':bool(error <= TOLERANCE)}
+                    records.append(record)
+                    if log: log(record)
+    return records
+
+
+def compare(records:list, baseline:list, rtol:float=.1, wtol:float=1., wmin:float=5e-3, etol:float=10.) -> list:
+    '''
+    Регресії відносно базових записів
+
+    Лічильники (nit, nfev, ngev, nhev) - більше ніж у (1 + rtol) разів;
+    час - більше ніж у (1 + wtol) разів і більше ніж на wmin секунд;
+    похибка - більше ніж у etol разів (і більше за 1e-8);
+    збіжність - базовий запис збігся, а новий - ні.
+    Незбіжні базові записи (converged = False) не є еталоном: з ними порівнюється лише збіжність.
+    '''
+    base = {(b['problem'], b['n'], b['method'], b['linesearch']):b for b in baseline}
+    regressions = []
+    for record in records:
+        b = base.get((record['problem'], record['n'], record['method'], record['linesearch']))
+        if b is None or not b['converged']: continue
+        if not record['converged']:
+            regressions.append(_regression(record, 'converged', b))
+            continue
+        for key in COUNTS:
+            if record[key] > b[key] * (1 + rtol): regressions.append(_regression(record, key, b))
+        if record['wall'] > b['wall'] * (1 + wtol) and record['wall'] - b['wall'] > wmin: regressions.append(_regression(record, 'wall', b))
+        if record['error'] > max(b['error'] * etol, 1e-8): regressions.append(_regression(record, 'error', b))
+    return regressions
+def _regression(record:dict, key:str, base:dict) -> dict:
+    return {'problem':record['problem'], 'n':record['n'], 'method':record['method'], 'linesearch':record['linesearch'], 'key':key, 'baseline':base[key], 'value':record[key]}
+
+
+def golden(path:str='.') -> list:
+    '''
+    Порівняння з еталонними трасами "Appumo - <метод>.xlsx" (задача main.py з точки (0, 0))
+
+    trace - усі точки ітерацій збігаються; result - значення функції в останній точці збігається з точністю eps.
+    '''
+    import pandas as pd
+    problem = PROBLEMS['main']
+    report = []
+    for file in sorted(glob.glob(f'{path}/Appumo - *.xlsx')):
+        method = file[file.rindex('Appumo - ') + 9:-5]
+        table = pd.read_excel(file)
+        X = np.array([ast.literal_eval(x) for x in table['x']], dtype=float)
+        umo = UMO(problem.fun, (.0, .0), problem.grad, problem.hesse, vectorized=True)
+        trace = umo.run(method).trace
+        trace_ok = len(trace) == len(X) and np.allclose(trace['x'], X, rtol=1e-9, atol=1e-12)
+        result_ok = abs(trace['fun'][-1] - float(table['fun'].iloc[-1])) < umo.EPS
+        report.append({'method':method, 'rows':len(trace), 'golden':len(X), 'trace':bool(trace_ok), 'result':bool(result_ok)})
+    return report
+
+
+def main(argv:list=None) -> int:
+    '''Запуск з командного рядка: 0 - без регресій, 1 - є регресії'''
+    parser = argparse.ArgumentParser(prog='python -m src.bench', description='Тест швидкодії методів UMO')
+    parser.add_argument('--dims', type=int, nargs='+', default=DIMS)
+    parser.add_argument('--methods', nargs='+', default=None, choices=UMO.METHODS)
+    parser.add_argument('--problems', nargs='+', default=None, choices=tuple(PROBLEMS))
+    parser.add_argument('--maxiter', type=int, default=1000)
+    parser.add_argument('--eps', type=float, default=1e-6)
+    parser.add_argument('--linesearch', nargs='+', default=UMO.LINESEARCHES, choices=UMO.LINESEARCHES, help='лінійні пошуки для методів SEARCHES')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--out', default=None, help='файл JSON для записів')
+    parser.add_argument('--baseline', default=BASELINE, help='базові записи JSON для порівняння')
+    parser.add_argument('--update', action='store_true', help='записати результати як базові')
+    parser.add_argument('--golden', action='store_true', help='порівняти з еталонними трасами xlsx')
+    args = parser.parse_args(argv)
+
+    status = 0
+    if args.golden:
+        for row in golden():
+            print(f"golden  {row['method']:28} rows {row['rows']:4}/{row['golden']:<4} trace {'ok' if row['trace'] else '--'}  result {'ok' if row['result'] else 'FAIL'}")
+            if not row['result']: status = 1
+    log = lambda r: print(f"{r['problem']:11} n={r['n']:<6} {r['method']:28} {r['linesearch'] or '-':9} nit {r['nit']:6} nfev {r['nfev']:8} ngev {r['ngev']:6} nhev {r['nhev']:6} {1e3 * r['wall']:10.1f} ms  error {r['error']:.2e}{'' if r['converged'] else '  NOT CONVERGED'}", flush=True)
+    records = run(args.methods, args.problems, tuple(args.dims), args.maxiter, args.eps, tuple(args.linesearch), args.repeat, log=log)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file: json.dump(records, file, ensure_ascii=False, indent=1)
+    if args.update:
+        with open(args.baseline, 'w', encoding='utf-8') as file: json.dump(records, file, ensure_ascii=False, indent=1)
+        return status
+    try:
+        with open(args.baseline, encoding='utf-8') as file: baseline = json.load(file)
+    except FileNotFoundError:
+        print(f'? bench: no baseline "{args.baseline}"')
+        return status
+    for r in compare(records, baseline):
+        print(f"REGRESSION {r['problem']} n={r['n']} {r['method']} {r['linesearch'] or '-'}: {r['key']} {r['baseline']:.6g} -> {r['value']:.6g}")
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+'''CLI - Розв'язок задач з командного рядка без інтерфейсу користувача
+
+    python main.py solve --method bfgs --fun "x[0]**2 + 2*x[1]**2" --x0 1 1 [--grad ...] [--hesse ...] [--eps 1e-6] [--out results.jsonl]
+    python main.py solve --batch problems.jsonl [--workers 4] [--out results.jsonl]
+
+Кожен рядок problems.jsonl - задача {"fun", "x0", "method"?, "grad"?, "hesse"?, "eps"?, "maxiter"?, "diff"?, "linesearch"?, "id"?};
+поля, яких немає, беруться з аргументів командного рядка. Результат кожної задачі - один рядок JSON.
+'''
+
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+
+from src.umo import UMO
+from src.expr import expression
+from src.autodiff import derivative
+
+
+ALIASES = {
+    'hooke-jeeves':'Хука-Дживса',
+    'nelder-mead':'Нелдера-Міда',
+    'nelder-mead-parallel':'Нелдера-Міда (паралельний)',
+    'steepest':'Найшвидшого спуску',
+    'cg':'Спряжених градієнтів',
+    'bfgs':'Квазі-Ньютона (BFGS)',
+    'lbfgs':'Квазі-Ньютона (L-BFGS)',
+    'newton':'Ньютона',
+    'newton-cg':'Ньютона-CG'
+}
+
+FIELDS = ('method', 'x', 'fun', 'nit', 'nfev', 'ngev', 'nhev', 'wall')
+
+
+def method(name:str) -> str:
+    '''Назва методу UMO за назвою або скороченням (bfgs, newton-cg, ...)'''
+    if name in UMO.METHODS: return name
+    if name.lower() in ALIASES: return ALIASES[name.lower()]
+    raise Exception(f'? cli: unknown method "{name}" (one of {", ".join(ALIASES)})')
+
+
+def solve(problem:dict) -> dict:
+    '''Розв'язок однієї задачі -> рядок результату (або {'error': ...})'''
+    try:
+        fun = expression('Function', problem['fun'])
+        x0 = tuple(float(x) for x in problem['x0'])
+        diff = problem.get('diff', 'auto')
+        grad, hesse = problem.get('grad'), problem.get('hesse')
+        if grad: grad = expression('Gradient', tuple(grad))
+        elif diff == 'auto': grad = derivative('Gradient', fun)
+        if hesse: hesse = expression('Hesse', tuple(tuple(row) for row in hesse))
+        elif diff == 'auto': hesse = derivative('Hesse', fun)
+        umo = UMO(fun, x0, grad, hesse, eps=problem.get('eps', 1e-3), maxiter=problem.get('maxiter', 100), vectorized=True,
+                  diff='central' if diff == 'auto' else diff, heavy=0, linesearch=problem.get('linesearch', 'quadratic'))
+        start = time.perf_counter()
+        result = umo.run(method(problem.get('method', 'bfgs'))).result
+        line = {key:result[key] for key in FIELDS} | {'wall':time.perf_counter() - start}
+    except Exception as exc:
+        line = {'error':f'{exc}'}
+    return ({'id':problem['id']} if 'id' in problem else {}) | line
+
+
+def problems(args:argparse.Namespace):
+    '''Задачі з файлу batch (рядки JSON) або з аргументів командного рядка (генератор)'''
+    defaults = {key:value for key, value in vars(args).items() if key in ('method', 'fun', 'x0', 'grad', 'hesse', 'eps', 'maxiter', 'diff', 'linesearch') and value is not None}
+    if defaults.get('hesse'):
+        n = int(len(defaults['hesse']) ** .5)
+        defaults['hesse'] = [defaults['hesse'][i * n:(i + 1) * n] for i in range(n)]
+    if not args.batch:
+        yield defaults
+        return
+    with (sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')) as file:
+        for line in file:
+            if line.strip(): yield defaults | json.loads(line)
+
+
+def results(tasks, pool=None, workers:int=1, chunksize:int=16):
+    '''Результати задач по порядку (генератор); у pool задачі подаються частинами по workers * chunksize'''
+    if pool is None:
+        yield from map(solve, tasks)
+        return
+      # у пулі щонайбільше дві частини: поточна віддає результати, наступна вже обчислюється
+    size = workers * chunksize
+    current = pool.map(solve, list(islice(tasks, size)), chunksize=chunksize)
+    while True:
+        batch = list(islice(tasks, size))
+        following = pool.map(solve, batch, chunksize=chunksize) if batch else None
+        yield from current
+        if following is None: return
+        current = following
+
+
+def main(argv:list=None) -> int:
+    '''Запуск з командного рядка: 0 - усі задачі розв'язано, 1 - є помилки'''
+    parser = argparse.ArgumentParser(prog='python main.py', description='Багатовимірна безумовна оптимізація без інтерфейсу користувача')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('solve', help='розв\'язок задачі або набору задач')
+    command.add_argument('--method', default=None, help=f'метод: {", ".join(ALIASES)} або назва з UMO.METHODS')
+    command.add_argument('--fun', default=None, help='вираз від x, наприклад "x[0]**2 + x[1]**2"')
+    command.add_argument('--x0', type=float, nargs='+', default=None, help='початкова точка')
+    command.add_argument('--grad', nargs='+', default=None, help='вирази градієнту (за замовчуванням - автоматичне диференціювання)')
+    command.add_argument('--hesse', nargs='+', default=None, help='вирази матриці Гессе по рядках (n x n)')
+    command.add_argument('--eps', type=float, default=None)
+    command.add_argument('--maxiter', type=int, default=None)
+    command.add_argument('--diff', default=None, choices=('auto', 'forward', 'central', 'complex'), help='похідні без виразів: auto - автоматичне диференціювання, інакше скінченні різниці')
+    command.add_argument('--linesearch', default=None, choices=UMO.LINESEARCHES)
+    command.add_argument('--batch', default=None, help='файл задач JSON Lines ("-" - stdin)')
+    command.add_argument('--workers', type=int, default=1, help='кількість процесів для batch')
+    command.add_argument('--out', default=None, help='файл результатів JSON Lines (за замовчуванням - stdout)')
+    args = parser.parse_args(argv)
+    if not args.batch and (args.fun is None or args.x0 is None): parser.error('solve: --fun and --x0 are required without --batch')
+
+    status = 0
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    pool = None
+    try:
+        if args.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(args.workers)
+        for line in results(problems(args), pool, args.workers):
+            if 'error' in line: status = 1
+            out.write(json.dumps(line, ensure_ascii=False) + '\n')
+            out.flush()
+    finally:
+          # при помилці або перериванні задачі, що ще не почалися, скасовуються
+        if pool: pool.shutdown(cancel_futures=True)
+        if out is not sys.stdout: out.close()
+    return status
@@ -0,0 +1,61 @@
+from functools import lru_cache
+import numpy as np
+
+
+NAMESPACE = {
+    'sqrt':np.sqrt, 'abs':np.abs,
+    'sin':np.sin, 'cos':np.cos, 'tan':np.tan,
+    'asin':np.arcsin, 'acos':np.arccos, 'atan':np.arctan,
+    'log':np.log, 'log10':np.log10, 'log2':np.log2,
+    'exp':np.exp, 'np':np
+}
+
+
+class Expression:
+    '''
+    **Expression** - *Скомпільований вираз від x*
+
+    *Використання:*
+
+        1. f = expression(what: str, text: str | tuple)  # 'Function' | 'Gradient' | 'Hesse'
+        2. f(x)   # x: (n,) -> скаляр | (n,) | (n, n)
+        3. f(X)   # X: (..., n) -> (...) | (..., n) | (..., n, n) одним векторизованим викликом (дійсні або комплексні числа)
+
+    У виразі x[i] - масив i-х координат усіх точок, а функції (sqrt, sin, exp, ...) - універсальні функції NumPy.
+    '''
+    def __init__(self, what:str, text:str|tuple):
+        self.what = what
+        self.text = text
+        match what:
+            case 'Function':
+                body = text
+            case 'Gradient':
+                body = '(' + ', '.join(text) + ',)'
+            case 'Hesse':
+                body = '(' + ', '.join(['(' + ', '.join(row) + ',)' for row in text]) + ',)'
+            case _:
+                raise Exception('[?]')
+        self._call = eval(compile('lambda x: ' + body, f'<{what}>', 'eval'), dict(NAMESPACE))
+
+    def __call__(self, x) -> np.ndarray:
+        dtype = complex if np.iscomplexobj(x) else float
+        x = np.asarray(x, dtype=dtype)
+        shape = x.shape[:-1]
+        value = self._call(np.moveaxis(x, -1, 0))
+        match self.what:
+            case 'Function':
+                return np.broadcast_to(value, shape).astype(dtype)
+            case 'Gradient':
+                return np.stack([np.broadcast_to(v, shape) for v in value], axis=-1).astype(dtype)
+            case 'Hesse':
+                return np.stack([np.stack([np.broadcast_to(v, shape) for v in row], axis=-1) for row in value], axis=-2).astype(dtype)
+    def __reduce__(self):
+        return expression, (self.what, self.text)
+    def __repr__(self):
+        return f'Expression({self.what!r}, {self.text!r})'
+
+
+@lru_cache(maxsize=128)
+def expression(what:str, text:str|tuple) -> Expression:
+    '''Скомпільований вираз (з кешу, якщо текст виразу не змінився)'''
+    return Expression(what, text)
@@ -0,0 +1,54 @@
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+
+class Memo:
+    '''
+    **Memo** - *Обмежений LRU-кеш значень функції за точними байтами точки x*
+
+    *Використання:*
+
+        1. memo = Memo(fun: callable, maxsize: int = 1024)
+        2. value = memo.get(x)   # None, якщо точки немає в кеші
+        3. memo.put(x, value)
+        4. memo.info() -> CacheInfo(hits, misses, maxsize, currsize)
+    '''
+    def __init__(self, fun:callable, maxsize:int=1024):
+        self.fun = fun
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, x):
+        '''Значення з кешу (або None)'''
+        key = self._key(x)
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            value = self._data[key]
+            return value.copy() if isinstance(value, np.ndarray) else value
+        self.misses += 1
+        return None
+    def put(self, x, value):
+        '''Запис значення в кеш з витісненням найдавнішого'''
+        key = self._key(x)
+        self._data[key] = value.copy() if isinstance(value, np.ndarray) else value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    def clear(self):
+        '''Очищення кешу і статистики'''
+        self.hits = 0
+        self.misses = 0
+        self._data.clear()
+    def info(self) -> CacheInfo:
+        '''Статистика кешу'''
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    @staticmethod
+    def _key(x) -> bytes:
+        return np.ascontiguousarray(x, dtype=float).tobytes()
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+SCHEMES = ('forward', 'central', 'complex')
+
+
+def step(x, scheme:str='central') -> np.ndarray:
+    '''Автоматичний крок диференціювання для кожної координати'''
+    x = np.asarray(x, dtype=float)
+    eps = np.finfo(float).eps
+    match scheme:
+        case 'forward': h = np.sqrt(eps) * np.maximum(1., np.abs(x))
+        case 'central': h = eps ** (1 / 3) * np.maximum(1., np.abs(x))
+        case 'complex': return np.full(x.shape, 1e-20)
+        case 'hesse': h = eps ** (1 / 4) * np.maximum(1., np.abs(x))
+        case _: raise Exception(f'! numdiff.step: unknown scheme "{scheme}"')
+      # крок, точно представлений у арифметиці з плаваючою комою
+    return (x + h) - x
+
+
+def gradient(funs:callable, x, scheme:str='central', h=None) -> np.ndarray:
+    '''
+    Градієнт за скінченними різницями
+
+    funs обчислює набір точок (k, n) -> k значень; усі точки шаблону передаються одним викликом:
+
+        forward - n + 1 точок, похибка O(h)
+        central - 2n точок, похибка O(h²)
+        complex - n комплексних точок, похибка O(h²) без втрати точності на відніманні (funs має приймати комплексні числа і бути аналітичною: без abs, min, max, порівнянь)
+    '''
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    h = step(x, scheme) if h is None else np.broadcast_to(np.asarray(h, dtype=float), x.shape)
+    E = np.diag(h)
+    match scheme:
+        case 'forward':
+            F = funs(np.vstack((x, x + E)))
+            return (F[1:] - F[0]) / h
+        case 'central':
+            F = funs(np.vstack((x + E, x - E)))
+            return (F[:n] - F[n:]) / (2 * h)
+        case 'complex':
+            F = funs(x + 1j * E)
+            return np.imag(F) / h
+        case _:
+            raise Exception(f'! numdiff.gradient: unknown scheme "{scheme}"')
+
+
+def hessian(funs:callable, x, h=None) -> np.ndarray:
+    '''
+    Матриця Гессе за центральними скінченними різницями
+
+    Усі 2n² + 1 точок шаблону передаються у funs одним викликом.
+    '''
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    h = step(x, 'hesse') if h is None else np.broadcast_to(np.asarray(h, dtype=float), x.shape)
+    E = np.diag(h)
+    I, J = np.triu_indices(n, 1)
+    m = len(I)
+    F = funs(np.vstack((x, x + E, x - E, x + E[I] + E[J], x + E[I] - E[J], x - E[I] + E[J], x - E[I] - E[J])))
+    f0, fp, fm = F[0], F[1:n + 1], F[n + 1:2 * n + 1]
+    fpp, fpm, fmp, fmm = F[2 * n + 1:].reshape(4, m)
+    H = np.diag((fp - 2 * f0 + fm) / h ** 2)
+    H[I, J] = H[J, I] = (fpp - fpm - fmp + fmm) / (4 * h[I] * h[J])
+    return H
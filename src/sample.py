@@ -0,0 +1,28 @@
+import numpy as np
+
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+
+def latin(lower, upper, k:int, seed:int=None):
+    '''Латинський гіперкуб: k початкових точок у прямокутнику [lower, upper] (генератор)'''
+    lower, upper = np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+    rng = np.random.default_rng(seed)
+      # у кожному стовпці рівно одна точка на кожен з k інтервалів
+    U = (rng.permuted(np.tile(np.arange(k), (len(lower), 1)), axis=1).T + rng.random((k, len(lower)))) / k
+    for u in U: yield lower + u * (upper - lower)
+
+
+def halton(lower, upper, k:int, skip:int=1):
+    '''Послідовність Холтона: k квазівипадкових початкових точок у прямокутнику [lower, upper] (генератор)'''
+    lower, upper = np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+    if len(lower) > len(PRIMES): raise Exception(f'! sample.halton: dimension > {len(PRIMES)}')
+    bases = np.array(PRIMES[:len(lower)])
+    for i in range(skip, skip + k):
+          # обернення цифр номера i в системах числення з простими основами
+        u, f, j = np.zeros(len(bases)), 1. / bases, np.full(len(bases), i)
+        while j.any():
+            u += f * (j % bases)
+            j //= bases
+            f /= bases
+        yield lower + u * (upper - lower)
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+import time
+
+
+class Stats:
+    '''
+    **Stats** - *Лічильники обчислень і час фаз розв'язку*
+
+    *Використання:*
+
+        1. stats = Stats()
+        2. stats.start()
+        3. with stats.phase('linesearch'): ...   # вкладені фази не враховуються в батьківській
+        4. stats.stop()
+        5. stats.asdict() -> {'nfev', 'ngev', 'nhev', 'wall', 'cpu', 'phases': {фаза: (wall, cpu)}}
+
+    Фази: fun, grad, hesse - обчислення функцій; linesearch - лінійний пошук; linalg - лінійна алгебра; other - решта.
+    '''
+    PHASES = ('fun', 'grad', 'hesse', 'linesearch', 'linalg', 'other')
+
+    def __init__(self):
+        self.nfev = 0
+        self.ngev = 0
+        self.nhev = 0
+        self.wall = {phase:.0 for phase in self.PHASES}
+        self.cpu = {phase:.0 for phase in self.PHASES}
+        self._stack = ['other']
+        self._mark = None
+
+    def start(self):
+        '''Початок (продовження) вимірювання'''
+        self._stack = ['other']
+        self._mark = (time.perf_counter(), time.process_time())
+    def stop(self):
+        '''Кінець вимірювання'''
+        self._charge()
+        self._mark = None
+
+    @contextmanager
+    def phase(self, name:str):
+        '''Вимірювання часу фази'''
+        self._charge()
+        self._stack.append(name)
+        try: yield
+        finally:
+            self._charge()
+            self._stack.pop()
+
+    def asdict(self) -> dict:
+        '''Лічильники і час'''
+        return {
+            'nfev':self.nfev, 'ngev':self.ngev, 'nhev':self.nhev,
+            'wall':sum(self.wall.values()), 'cpu':sum(self.cpu.values()),
+            'phases':{phase:(self.wall[phase], self.cpu[phase]) for phase in self.PHASES}
+        }
+
+    def _charge(self):
+        '''Зарахування часу від останньої позначки поточній фазі'''
+        if self._mark is None: return
+        mark = (time.perf_counter(), time.process_time())
+        phase = self._stack[-1]
+        self.wall[phase] += mark[0] - self._mark[0]
+        self.cpu[phase] += mark[1] - self._mark[1]
+        self._mark = mark
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class Trace:
+    '''
+    **Trace** - *Колонкова таблиця ітерацій у попередньо виділених масивах NumPy*
+
+    *Використання:*
+
+        1. trace = Trace(method: str, maxiter: int, fields: dict, heavy: int = 1)   # fields: {назва: форма рядка}
+        2. trace.append(x=x, fun=fx, ...)
+        3. trace['x'] -> (len, n) | trace.row(i) -> dict масивів | trace.record(i) -> dict списків
+        4. trace.frame() -> pd.DataFrame   # будується лише на вимогу (pandas імпортується при першому виклику)
+
+    Важкі поля (HEAVY) зберігаються кожну heavy-ту ітерацію (heavy = 0 - не зберігаються).
+    '''
+
+    HEAVY = ('simplex', 'hesse')
+
+    def __init__(self, method:str, maxiter:int, fields:dict, heavy:int=1):
+        self.method = method
+        self.heavy = heavy
+        self.size = 0
+        self.columns = {}
+        for name, shape in fields.items():
+            rows = maxiter
+            if name in self.HEAVY: rows = -(-maxiter // heavy) if heavy > 0 else 0
+            self.columns[name] = np.empty((rows,) + tuple(shape))
+
+    def __len__(self) -> int:
+        return self.size
+    def __getitem__(self, name:str) -> np.ndarray:
+        '''Стовпець заповнених рядків (для важких полів - лише збережені ітерації)'''
+        if name in self.HEAVY: return self.columns[name][:self._slot(self.size - 1) + 1] if self.heavy > 0 else self.columns[name][:0]
+        return self.columns[name][:self.size]
+
+    def append(self, **values):
+        '''Запис ітерації'''
+        i = self.size
+        for name, value in values.items():
+            if name not in self.HEAVY: self.columns[name][i] = value
+            elif self._stored(i): self.columns[name][self._slot(i)] = value
+        self.size += 1
+
+    def row(self, i:int) -> dict:
+        '''Ітерація як dict масивів (без копіювання)'''
+        i = range(self.size)[i]
+        row = {'method':self.method}
+        for name, column in self.columns.items():
+            if name not in self.HEAVY: row[name] = column[i]
+            elif self._stored(i): row[name] = column[self._slot(i)]
+            else: row[name] = None
+        return row
+    def record(self, i:int) -> dict:
+        '''Ітерація як dict чисел і списків'''
+        return {name:(value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value) for name, value in self.row(i).items()}
+    def frame(self):
+        '''Таблиця ітерацій'''
+        import pandas as pd
+        return pd.DataFrame([self.record(i) for i in range(self.size)])
+
+    def _stored(self, i:int) -> bool:
+        return self.heavy > 0 and i % self.heavy == 0
+    def _slot(self, i:int) -> int:
+        return i // self.heavy
@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import lru_cache
 
 
 class Theme(Enum): Dark, Light = 'dark', 'light'
@@ -62,3 +63,18 @@ class UI:
         '''Перемикання колорової-мапи для графіку'''
         self.cmapi = (self.cmapi + 1) % len(self.CMAPS)
         return self.cmap()
+
+
+@lru_cache(maxsize=None)
+def image(name:str):
+    '''Зображення icons/<name>.png (декодується один раз)'''
+    from PIL import Image
+    png = Image.open(f'icons/{name}.png')
+    png.load()
+    return png
+
+def icon(name:str, size:tuple):
+    '''Іконка CTkImage icons/<name>.png розміру size (з декодованого зображення)'''
+    from customtkinter import CTkImage
+    png = image(name)
+    return CTkImage(dark_image=png, light_image=png, size=size)
@@ -1,7 +1,11 @@
-import pandas as pd
 import numpy as np
 from numpy import linalg as LA
 
+from src import numdiff
+from src.memo import Memo
+from src.stats import Stats
+from src.trace import Trace
+
 
 class UMO:
     '''
@@ -9,84 +13,345 @@ class UMO:
     
     *Використання:*
 
-        1. umo = UMO(fun: callable, x: tuple | list = (.0,.0), grad: callable = None, hesse: callable = None, eps: float = 1e-3, maxiter: int = 1000)
-        2. umo.solve(method: str)
-        3. umo.displayResult() | result = umo.result | table = umo.table
+        1. umo = UMO(fun: callable, x: tuple | list = (.0,.0), grad: callable = None, hesse: callable = None, hessp: callable = None, eps: float = 1e-3, maxiter: int = 1000, vectorized: bool = False, diff: str = 'central', pool: Executor = None, cache: int = 0, callback: callable = None, heavy: int = 1, history: int = 10, linesearch: str = 'quadratic', parallel: int = None)
+        2. umo.solve(method: str, stop = None, callback = None) | run = umo.run(method: str, x = None, stop = None, callback = None) | for state in umo.iterate(method): ...
+           umo.solve_many(method: str, starts, workers: int = None, target: float = None) | umo.race(methods: tuple = None, workers: int = None, stop: bool = False)
+        3. umo.displayResult() | result = umo.result | table = umo.table | umo.cacheInfo() | umo.stats
+    
+    Якщо vectorized = True, то fun приймає масив точок (k, n) і повертає k значень,
+    а методи обчислюють набори точок (пробні кроки, вершини симплексу, кандидати лінійного пошуку) одним викликом.
+    Інакше набори точок можна обчислювати паралельно у pool (concurrent.futures.Executor).
+    
+    Якщо grad | hesse = None, то вони обчислюються скінченними різницями (diff: 'forward' | 'central' | 'complex').
+    diff = 'complex' (комплексний крок) правильний лише для аналітичних fun: abs, sign, min, max, порівняння,
+    дійсна частина чи модуль комплексного числа відкидають уявну частину, і градієнт мовчки виходить хибним (для abs - нульовим).
+    
+    Якщо cache > 0, то значення fun, grad, hesse запам'ятовуються (LRU-кеш на cache точок для кожної функції).
+    
+    Кожен розв'язок рахує обчислення (nfev, ngev, nhev) і час фаз (umo.stats, result['phases']);
+    callback(state) викликається після кожної ітерації з рядком таблиці та лічильниками.
+    
+    iterate(method) - генератор станів ітерацій (dict: method, nit, nfev, ngev, nhev і поля таблиці);
+    дозволяє передавати результати потоково і зупинити розв'язок ззовні (break | close()); run побудований на ньому.
+    
+    Стан розв'язку (x, result, trace, stats, кеш) належить копії UMO: run та iterate не змінюють екземпляр,
+    тому розв'язки одного UMO можна виконувати одночасно (потоки, процеси). run повертає копію з result, trace, stats;
+    stop - подія (threading.Event | multiprocessing.Event), яка зупиняє розв'язок після поточної ітерації;
+    callback, переданий у solve | run, замінює umo.callback лише для цього розв'язку.
+    solve = run, результат якого записується в umo.result, umo.trace, umo.stats.
+    
+    Ітерації зберігаються в колонковій таблиці umo.trace (масиви NumPy); DataFrame umo.table будується лише при читанні.
+    Важкі поля (hesse, simplex) зберігаються кожну heavy-ту ітерацію (heavy = 0 - не зберігаються).
+    
+    history - кількість останніх пар (s, y), які зберігає метод L-BFGS.
+    
+    linesearch - лінійний пошук градієнтних методів:
+    
+        'quadratic' - розширення кроку і квадратична інтерполяція (лише значення функції)
+        'wolfe' - сильні умови Вольфе з кубічною інтерполяцією (використовує похідну за напрямом і повертає f, ∇f у новій точці)
+    
+    Паралельний метод Нелдера-Міда відбиває parallel найгірших вершин за ітерацію (за замовчуванням і не більше - n // 2, щонайменше 1);
+    їхні кандидати обчислюються одним набором точок: одним викликом fun, якщо vectorized = True, або паралельно у pool.
+    Без vectorized і pool кандидати обчислюються послідовно, тож для паралельного обчислення потрібен pool.
+    
+    solve_many - мультистарт: незалежні розв'язки з кожної початкової точки starts (масив (k, n) або генератор,
+    наприклад src.sample.latin | halton) у ProcessPoolExecutor(workers); повертає {'results': [...], 'best': result}.
+    Якщо target задано, то решта розв'язків скасовується, щойно знайдено fun <= target (розпочаті зупиняються після поточної ітерації).
+    fun, grad, hesse мають серіалізуватися pickle (функції модуля, вирази src.expr); pool і callback у процеси не передаються.
+    
+    race - перегони: усі методи (або methods) одночасно у ProcessPoolExecutor(workers) на одній задачі;
+    повертає таблицю порівняння (list[dict]: method, x, fun, nit, nfev, ngev, nhev, wall, converged).
+    Якщо stop = True, то решта методів зупиняється, щойно перший метод збігся (nit < maxiter).
+    
+    Метод Ньютона-CG не будує матрицю Гессе: він використовує добуток hessp(x, v) = ∇²f(x) v
+    (або різниці градієнтів, якщо hessp = None).
     '''
     
     METHODS = (
         'Хука-Дживса',
         'Нелдера-Міда',
+        'Нелдера-Міда (паралельний)',
         'Найшвидшого спуску',
         'Спряжених градієнтів',
         'Квазі-Ньютона (BFGS)',
-        'Ньютона')
+        'Квазі-Ньютона (L-BFGS)',
+        'Ньютона',
+        'Ньютона-CG')
     
-    def __init__(self, fun:callable, x:tuple=(.0, .0), grad:callable=None, hesse:callable=None, eps:float=1e-3, maxiter:int=100):
+    LINESEARCHES = ('quadratic', 'wolfe')
+    
+    META = ('method', 'nit', 'nfev', 'ngev', 'nhev')
+    
+    def __init__(self, fun:callable, x:tuple=(.0, .0), grad:callable=None, hesse:callable=None, hessp:callable=None, eps:float=1e-3, maxiter:int=100, vectorized:bool=False, diff:str='central', pool=None, cache:int=0, callback:callable=None, heavy:int=1, history:int=10, linesearch:str='quadratic', parallel:int=None):
         self.fun = fun
         self.x = x
         self.grad = grad
         self.hesse = hesse
+        self.hessp = hessp
         self.EPS = eps
         self.MAXITER = maxiter
+        self.vectorized = vectorized
+        self.diff = diff
+        self.pool = pool
+        self.cache = cache
+        self.callback = callback
+        self.heavy = heavy
+        self.HISTORY = history
+        self.linesearch = linesearch
+        self.PARALLEL = parallel
         self.result = None
+        self.trace = None
+        self.stats = Stats()
+        self.stopped = False
+        self._table = None
+        self._memos = {}
     
-    def solve(self, method:str):
+    def solve(self, method:str, stop=None, callback:callable=None):
         '''
         Оптимізація функції за методом:
         
             метод "Хука-Дживса"
             метод "Нелдера-Міда"
+            метод "Нелдера-Міда (паралельний)"
             метод "Найшвидшого спуску"
             метод "Спряжених градієнтів"
             метод "Квазі-Ньютона (BFGS)"
+            метод "Квазі-Ньютона (L-BFGS)"
             метод "Ньютона"
+            метод "Ньютона-CG"
         '''
-        self.result = None
-        self.table = None
-        match method:
-            case 'Хука-Дживса': self.result, self.table = self._hookejeeves()
-            case 'Нелдера-Міда': self.result, self.table = self._neldermead()
-            case 'Найшвидшого спуску': self.result, self.table = self._steepestDescent()
-            case 'Спряжених градієнтів': self.result, self.table = self._conjugateGradient()
-            case 'Квазі-Ньютона (BFGS)': self.result, self.table = self._bfgs()
-            case 'Ньютона': self.result, self.table = self._newton()
-            case _: raise Exception('! Неправильне введення методу оптимізації !')
+        run = self.run(method, stop=stop, callback=callback)
+        self.result, self.trace, self.stats, self.stopped, self._memos = run.result, run.trace, run.stats, run.stopped, run._memos
+        self._table = None
+    def run(self, method:str, x=None, stop=None, callback:callable=None) -> 'UMO':
+        '''Розв'язок на копії UMO (екземпляр не змінюється) -> копія з result, trace, stats, stopped'''
+        run = self._copy(x)
+        if callback is not None: run.callback = callback
+        trace = None
+        for state in run._iterate(method, run._steps(method)):
+            if trace is None: trace = Trace(method, run.MAXITER, {name:np.shape(value) for name, value in state.items() if name not in run.META}, run.heavy)
+            trace.append(**{name:value for name, value in state.items() if name not in run.META})
+            if stop is not None and stop.is_set():
+                run.stopped = True
+                break
+        run.trace = trace
+        run.result = trace.record(-1) | {'nit':len(trace)} | run.stats.asdict()
+        return run
+    def iterate(self, method:str):
+        '''Покрокова оптимізація за методом (на копії UMO): генератор станів ітерацій'''
+        run = self._copy()
+        return run._iterate(method, run._steps(method))
+    def solve_many(self, method:str, starts, workers:int=None, target:float=None) -> dict:
+        '''Мультистарт: розв'язки з кожної початкової точки у пулі процесів -> {'results': [...], 'best': result}'''
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        results = {}
+        context = _context()
+        event = context.Event()
+        pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_initialize, initargs=(self, event))
+        try:
+            futures = {pool.submit(_solve, method, tuple(np.asarray(x, dtype=float).tolist())):i for i, x in enumerate(starts)}
+            for future in as_completed(futures):
+                result = results[futures[future]] = future.result()
+                if target is not None and result['fun'] <= target:
+                    event.set()
+                    break
+        finally:
+              # нерозпочаті розв'язки скасовуються, розпочаті зупиняються подією після поточної ітерації і не очікуються
+            pool.shutdown(wait=False, cancel_futures=True)
+        results = [results[i] for i in sorted(results)]
+        return {'results':results, 'best':min(results, key=lambda result: result['fun'], default=None)}
+    def race(self, methods:tuple=None, workers:int=None, stop:bool=False) -> list:
+        '''Перегони методів у пулі процесів -> таблиця порівняння (list[dict])'''
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        methods = tuple(methods or self.METHODS)
+        if any(method not in self.METHODS for method in methods): raise Exception('! Неправильне введення методу оптимізації !')
+        context = _context()
+        event = context.Event()
+        rows = {}
+        with ProcessPoolExecutor(workers or len(methods), mp_context=context, initializer=_initialize, initargs=(self, event)) as pool:
+            pending = {pool.submit(_race, method) for method in methods}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = future.result()
+                    rows[row['method']] = row
+                      # переможець зупиняє решту методів після їхньої поточної ітерації
+                    if stop and row['converged']: event.set()
+        return [rows[method] for method in methods]
+    
+    @property
+    def table(self):
+        '''Таблиця ітерацій (pd.DataFrame, будується при першому читанні)'''
+        if self._table is None and self.trace is not None: self._table = self.trace.frame()
+        return self._table
     
     def displayResult(self):
         print('Result:')
         for key in self.result:
             if key == 'method': print(f' Method: {self.result[key]}')
+            elif key == 'phases':
+                for phase, (wall, cpu) in self.result[key].items(): print(f'    {phase}\t   =\t {wall:.6f} s (cpu {cpu:.6f} s)')
             else: print(f'  {key}\t   =\t {self.result[key]}')
         print()
+    def __getstate__(self) -> dict:
+        '''Стан для передачі у процес: без пулу, callback і результатів розв'язку'''
+        state = self.__dict__.copy()
+        state.update(pool=None, callback=None, result=None, trace=None, stats=Stats(), stopped=False, _table=None, _memos={})
+        return state
+    def cacheInfo(self) -> dict:
+        '''Статистика кешу значень fun, grad, hesse'''
+        return {what:memo.info() for what, memo in self._memos.items()}
+    
+    def _copy(self, x=None) -> 'UMO':
+        '''Копія UMO для одного розв'язку (власні x, result, trace, stats, кеш; pool і callback - спільні)'''
+          # не copy.copy: він іде через __getstate__, який відкидає pool і callback для процесів
+        run = object.__new__(type(self))
+        run.__dict__.update(self.__dict__)
+        if x is not None: run.x = x
+        run.result, run.trace, run.stats, run.stopped, run._table, run._memos = None, None, Stats(), False, None, {}
+        return run
+    def _steps(self, method:str):
+        '''Генератор ітерацій методу'''
+        match method:
+            case 'Хука-Дживса': return self._hookejeeves()
+            case 'Нелдера-Міда': return self._neldermead()
+            case 'Нелдера-Міда (паралельний)': return self._parallelNeldermead()
+            case 'Найшвидшого спуску': return self._steepestDescent()
+            case 'Спряжених градієнтів': return self._conjugateGradient()
+            case 'Квазі-Ньютона (BFGS)': return self._bfgs()
+            case 'Квазі-Ньютона (L-BFGS)': return self._lbfgs()
+            case 'Ньютона': return self._newton()
+            case 'Ньютона-CG': return self._newtonCG()
+            case _: raise Exception('! Неправильне введення методу оптимізації !')
+    def _memo(self, what:str, fun:callable) -> Memo:
+        '''Кеш значень функції (None, якщо кешування вимкнене)'''
+        if self.cache <= 0 or not fun: return None
+        memo = self._memos.get(what)
+        if memo is None or memo.fun is not fun or memo.maxsize != self.cache:
+            memo = self._memos[what] = Memo(fun, self.cache)
+        return memo
+    def _iterate(self, method:str, steps):
+        '''Стани ітерацій з лічильниками; час поза методом (у споживача) не враховується'''
+        self.stats.start()
+        for nit, values in enumerate(steps, start=1):
+            self.stats.stop()
+            state = {'method':method, 'nit':nit, 'nfev':self.stats.nfev, 'ngev':self.stats.ngev, 'nhev':self.stats.nhev} | values
+            if self.callback: self.callback(state)
+            yield state
+            self.stats.start()
+        self.stats.stop()
+    def _fun(self, x) -> float:
+        '''Значення функції в точці'''
+        x = np.asarray(x, dtype=float)
+        memo = self._memo('fun', self.fun)
+        if memo:
+            fx = memo.get(x)
+            if fx is not None: return fx
+        with self.stats.phase('fun'):
+            if self.vectorized: fx = float(np.asarray(self.fun(x[np.newaxis]), dtype=float).reshape(1)[0])
+            else: fx = float(self.fun(x))
+        self.stats.nfev += 1
+        if memo: memo.put(x, fx)
+        return fx
+    def _funs(self, X) -> np.ndarray:
+        '''Значення функції в наборі точок (k, n) одним викликом'''
+        dtype = complex if np.iscomplexobj(X) else float
+        X = np.asarray(X, dtype=dtype)
+        memo = self._memo('fun', self.fun) if dtype is float else None
+        if not memo: return self._evaluate(X)
+        F = np.empty(len(X))
+        miss = []
+        for i, x in enumerate(X):
+            fx = memo.get(x)
+            if fx is None: miss.append(i)
+            else: F[i] = fx
+        if miss:
+            F[miss] = self._evaluate(X[miss])
+            for i in miss: memo.put(X[i], float(F[i]))
+        return F
+    def _evaluate(self, X) -> np.ndarray:
+        '''Обчислення функції в наборі точок без кешу'''
+        self.stats.nfev += len(X)
+        with self.stats.phase('fun'):
+            if self.vectorized: return np.asarray(self.fun(X), dtype=X.dtype).reshape(len(X))
+            if self.pool: return np.fromiter(self.pool.map(self.fun, X), dtype=X.dtype, count=len(X))
+            return np.array([self.fun(x) for x in X], dtype=X.dtype)
+    def _grad(self, x) -> np.ndarray:
+        '''Градієнт в точці (аналітичний або за скінченними різницями)'''
+        memo = self._memo('grad', self.grad)
+        if memo:
+            g = memo.get(x)
+            if g is not None: return g
+        self.stats.ngev += 1
+        with self.stats.phase('grad'):
+            if self.grad: g = np.asarray(self.grad(x), dtype=float)
+            else: return numdiff.gradient(self._funs, x, scheme=self.diff)
+        if memo: memo.put(x, g)
+        return g
+    def _hesse(self, x) -> np.ndarray:
+        '''Матриця Гессе в точці (аналітична або за скінченними різницями)'''
+        memo = self._memo('hesse', self.hesse)
+        if memo:
+            H = memo.get(x)
+            if H is not None: return H
+        self.stats.nhev += 1
+        with self.stats.phase('hesse'):
+            if self.hesse: H = np.asarray(self.hesse(x), dtype=float)
+            else: return numdiff.hessian(self._funs, x)
+        if memo: memo.put(x, H)
+        return H
+    def _hessp(self, x, v, dx=None) -> np.ndarray:
+        '''Добуток матриці Гессе на вектор (hessp або різниця градієнтів)'''
+        if self.hessp:
+            self.stats.nhev += 1
+            with self.stats.phase('hesse'): return np.asarray(self.hessp(x, v), dtype=float)
+        if dx is None: dx = self._grad(x)
+        vnorm = LA.norm(v)
+        if vnorm == 0: return np.zeros_like(x)
+        h = np.sqrt(np.finfo(float).eps) * (1. + LA.norm(x)) / vnorm
+          # різниця градієнтів - це одне обчислення градієнта (ngev); пробна точка не кешується, бо більше не знадобиться
+        y = x + h * v
+        self.stats.ngev += 1
+        with self.stats.phase('grad'):
+            if self.grad: gy = np.asarray(self.grad(y), dtype=float)
+            else: gy = numdiff.gradient(self._funs, y, scheme=self.diff)
+        return (gy - dx) / h
     
     def _hookejeeves(self):
         '''Метод Хука-Дживса'''
         x = np.asarray(self.x, dtype=float)
         y = np.asarray(self.x, dtype=float)
-        fx = self.fun(x)
-        fy = self.fun(y)
+        fx = self._fun(x)
+        fy = fx
         delta = .5
         alpha = .5
-        table = []
         for _ in range(self.MAXITER):
-            table.append({'method':'Хука-Дживса', 'x':x.tolist(), 'fun':float(self.fun(x)), 'delta':delta})
+            yield dict(x=x, fun=fx, delta=delta)
             if delta < self.EPS: break
             for j in range(len(x)):
-                d = 0
+                if self.vectorized or self.pool:
+                      # пробні кроки +delta, -delta одним набором точок
+                    Y = np.array((y, y))
+                    Y[0][j] += delta
+                    Y[1][j] -= delta
+                    fY = self._funs(Y)
+                    if fY[0] < fy:
+                        y = Y[0]
+                        fy = fY[0]
+                    elif fY[1] < fy:
+                        y = Y[1]
+                        fy = fY[1]
+                    continue
+                  # пробний крок -delta, лише якщо +delta не покращив
                 yj = y.copy()
                 yj[j] += delta
-                fyj = self.fun(yj)
+                fyj = self._fun(yj)
+                if fyj >= fy:
+                    yj[j] -= 2 * delta
+                    fyj = self._fun(yj)
                 if fyj < fy:
-                    d = 1
+                    y = yj
                     fy = fyj
-                else:
-                    yj[j] -= 2 * delta
-                    fyj = self.fun(yj)
-                    if fyj < fy:
-                        d = -1
-                        fy = fyj
-                y[j] += delta * d
             if fy < fx:
                 xk = y.copy()
                 y = xk + (xk - x)
@@ -96,132 +361,357 @@ class UMO:
                 delta *= alpha
                 y = x.copy()
                 fy = fx
-        return table[-1], pd.DataFrame(table)
     def _neldermead(self, delta=1.):
         '''Метод Нелдера-Міда'''
         x = np.asarray(self.x, dtype=float)
-        simplex = [x]
-        fsimplex = [self.fun(x)]
-        for i in range(len(x)):
-            y = x.copy()
-            y[i] += delta
-            simplex.append(y)
-            fsimplex.append(self.fun(y))
-        simplex = np.array(simplex, dtype=float)
-        fsimplex = np.array(fsimplex, dtype=float)
-        table = []
-        for _ in range(self.MAXITER):
-            sidxs = np.argsort(fsimplex)
-            simplex = simplex[sidxs]
-            fsimplex = fsimplex[sidxs]
-            p = simplex[:-1].mean(axis=0)
-            if abs(fsimplex[-1] - self.fun(p)) < self.EPS: break
-            xk = simplex[-1] + 2. * (p - simplex[-1])
-            fxk = self.fun(xk)
-            if fxk < fsimplex[0]:
-                theta = 2.
-            elif fsimplex[-1] <= fxk <= fsimplex[-2]:
-                theta = .5
-            elif fxk >= self.fun(p):
-                theta = -.5
-            else:
-                theta = 1.
-            xk = simplex[-1] + (1 + theta) * (p - simplex[-1])
-            table.append({'method':'Нелдера-Міда', 'x':xk.tolist(), 'fun':float(fsimplex[0].tolist()), 'simplex':[s.tolist() for s in simplex], 'fsimplex':[float(fs) for fs in fsimplex]})
-            simplex[-1] = xk
-            fsimplex[-1] = self.fun(xk)
-        return table[-1], pd.DataFrame(table)
+        n = len(x)
+        alpha, beta, gamma, sigma = self._nmcoefs(n)
+        simplex, fsimplex = self._simplex(x, delta)
+          # вершини не переставляються: order - індекси за зростанням функції, total - сума вершин
+        order = np.argsort(fsimplex, kind='stable')
+        total = simplex.sum(axis=0)
+        for it in range(self.MAXITER):
+            b, s, w = order[0], order[-2], order[-1]
+            if self._collapsed(simplex, fsimplex, b, w): break
+            p = (total - simplex[w]) / n
+            xr = p + alpha * (p - simplex[w])
+            fxr = self._fun(xr)
+            xk, fxk = xr, fxr
+            if fxr < fsimplex[b]:
+                xe = p + beta * (xr - p)
+                fxe = self._fun(xe)
+                if fxe < fxr: xk, fxk = xe, fxe
+            elif fxr >= fsimplex[s]:
+                if fxr < fsimplex[w]: xc = p + gamma * (xr - p)
+                else: xc = p + gamma * (simplex[w] - p)
+                fxc = self._fun(xc)
+                if fxc < min(fxr, fsimplex[w]): xk, fxk = xc, fxc
+                else: xk = None
+            heavy = self.heavy > 0 and it % self.heavy == 0
+            yield dict(x=xk if xk is not None else simplex[b].copy(), fun=fsimplex[b],
+                       simplex=simplex[order] if heavy else None, fsimplex=fsimplex[order])
+            if xk is None:
+                  # редукція до найкращої вершини: n нових вершин одним викликом
+                others = order[1:]
+                simplex[others] = simplex[b] + sigma * (simplex[others] - simplex[b])
+                fsimplex[others] = self._funs(simplex[others])
+                order = np.argsort(fsimplex, kind='stable')
+                total = simplex.sum(axis=0)
+                continue
+              # заміна найгіршої вершини і вставка її на місце за значенням функції, O(n)
+            total += xk - simplex[w]
+            simplex[w] = xk
+            fsimplex[w] = fxk
+            order = order[:-1]
+            order = np.insert(order, np.searchsorted(fsimplex[order], fxk, side='right'), w)
+              # періодичне уточнення суми вершин від накопичення похибки
+            if it % (n + 1) == n: total = simplex.sum(axis=0)
+    def _parallelNeldermead(self, delta=1.):
+        '''Паралельний метод Нелдера-Міда (Лі-Вісвол): відбиття кількох найгірших вершин за ітерацію'''
+        x = np.asarray(self.x, dtype=float)
+        n = len(x)
+          # p < n, інакше центр тяжіння вироджується в найкращу вершину і симплекс сплющується
+        p = max(1, min(self.PARALLEL or n // 2, n // 2))
+        alpha, beta, gamma, sigma = self._nmcoefs(n)
+        simplex, fsimplex = self._simplex(x, delta)
+        for it in range(self.MAXITER):
+            order = np.argsort(fsimplex, kind='stable')
+            b, worst = order[0], order[-p:]
+            if self._collapsed(simplex, fsimplex, b, order[-1]): break
+            fb, fs = fsimplex[b], fsimplex[order[-p - 1]]
+            c = simplex[order[:-p]].mean(axis=0)
+            W, fW = simplex[worst], fsimplex[worst]
+              # відбиття p найгірших вершин одним набором точок
+            X = c + alpha * (c - W)
+            F = self._funs(X)
+            Xk, Fk = X.copy(), F.copy()
+            accepted = F < fs
+              # розтягнення для відбиттів, кращих за найкращу вершину
+            expand = F < fb
+            if expand.any():
+                Xe = c + beta * (X[expand] - c)
+                Fe = self._funs(Xe)
+                better = Fe < F[expand]
+                Xk[np.flatnonzero(expand)[better]] = Xe[better]
+                Fk[np.flatnonzero(expand)[better]] = Fe[better]
+              # зовнішнє або внутрішнє стиснення для решти
+            contract = ~accepted
+            if contract.any():
+                outside = (F < fW)[contract]
+                Xc = np.where(outside[:, np.newaxis], c + gamma * (X[contract] - c), c + gamma * (W[contract] - c))
+                Fc = self._funs(Xc)
+                better = Fc < np.minimum(F[contract], fW[contract])
+                Xk[np.flatnonzero(contract)[better]] = Xc[better]
+                Fk[np.flatnonzero(contract)[better]] = Fc[better]
+                accepted[np.flatnonzero(contract)[better]] = True
+            heavy = self.heavy > 0 and it % self.heavy == 0
+            xk = Xk[np.argmin(np.where(accepted, Fk, np.inf))] if accepted.any() else simplex[b].copy()
+            yield dict(x=xk, fun=fb, simplex=simplex[order] if heavy else None, fsimplex=fsimplex[order])
+            if not accepted.any():
+                  # редукція до найкращої вершини: n нових вершин одним набором точок
+                others = order[1:]
+                simplex[others] = simplex[b] + sigma * (simplex[others] - simplex[b])
+                fsimplex[others] = self._funs(simplex[others])
+                continue
+            simplex[worst[accepted]] = Xk[accepted]
+            fsimplex[worst[accepted]] = Fk[accepted]
+    def _collapsed(self, simplex, fsimplex, b:int, w:int) -> bool:
+        '''Критерій зупинки Нелдера-Міда: малі і розкид значень функції, і діаметр симплексу'''
+          # лише розкид значень недостатній: симплекс може лежати на лінії рівня далеко від мінімуму
+        return fsimplex[w] - fsimplex[b] < self.EPS and np.max(LA.norm(simplex - simplex[b], axis=1)) < self.EPS
+    def _nmcoefs(self, n:int) -> tuple:
+        '''Коефіцієнти, залежні від розмірності (Гао-Хань): відбиття, розтягнення, стиснення, редукція'''
+        return 1., 1. + 2. / n, .75 - .5 / n, 1. - 1. / n
+    def _simplex(self, x, delta:float) -> tuple:
+        '''Початковий симплекс і значення функції у вершинах (одним набором точок)'''
+        simplex = np.vstack((x, x + delta * np.eye(len(x))))
+        return simplex, self._funs(simplex)
     def _steepestDescent(self):
         '''Метод найшвидшого спуску'''
         x = np.asarray(self.x, dtype=float)
         alpha = .0
-        dx = -self.grad(x)
-        table = []
+        fx = self._fun(x)
+        dx = -self._grad(x)
         for _ in range(self.MAXITER):
-            table.append({'method':'Найшвидшого спуску', 'x':x.tolist(), 'fun':float(self.fun(x)), 'grad':dx.tolist(), 'alpha':float(alpha), 'gnorm':float(LA.norm(-dx))})
+            yield dict(x=x, fun=fx, grad=dx, alpha=alpha, gnorm=LA.norm(-dx))
             if LA.norm(-dx) < self.EPS: break
-            alpha = self._line_search(x, dx)
-            x += alpha * dx
-            dx = -self.grad(x)
-        return table[-1], pd.DataFrame(table)
+            alpha, x, fx, g = self._step(x, dx, fx, -dx, a1=alpha or 1. / LA.norm(dx, np.inf))
+            dx = -g
     def _conjugateGradient(self):
         '''Метод спряжених градієнтів'''
         x = np.asarray(self.x, dtype=float)
         alpha = .0
-        dx = -self.grad(x)
+        fx = self._fun(x)
+        g = self._grad(x)
+        dx = -g
         gnorm = LA.norm(-dx)
-        table = []
         for _ in range(self.MAXITER):
-            table.append({'method':'Спряжених градієнтів', 'x':x.tolist(), 'fun':float(self.fun(x)), 'grad':dx.tolist(), 'alpha':float(alpha), 'gnorm':float(gnorm)})
+            yield dict(x=x, fun=fx, grad=dx, alpha=alpha, gnorm=gnorm)
             if gnorm < self.EPS: break
-            alpha = self._line_search(x, dx)
-            x += alpha * dx
-            gnormk = LA.norm(self.grad(x))
+            alpha, x, fx, g = self._step(x, dx, fx, g, a1=alpha or 1. / LA.norm(dx, np.inf), c2=.1)
+            gnormk = LA.norm(g)
             beta = gnormk ** 2 / gnorm ** 2
-            dx = beta * dx - self.grad(x)
+            dx = beta * dx - g
             gnorm = gnormk
-        return table[-1], pd.DataFrame(table)
     def _bfgs(self):
         '''Метод Бройдена-Флетчера-Гольдфарба-Шанно'''
         x = np.asarray(self.x, dtype=float)
         H = np.eye(len(x))
-        dx = self.grad(x)
+        fx = self._fun(x)
+        dx = self._grad(x)
         gnorm = LA.norm(dx)
-        table = []
         for _ in range(self.MAXITER):
-            table.append({'method':'Квазі-Ньютона (BFGS)', 'x':x.tolist(), 'fun':float(self.fun(x)), 'grad':dx.tolist(), 'hesse':H.tolist(), 'gnorm':float(gnorm)})
+            yield dict(x=x, fun=fx, grad=dx, hesse=H, gnorm=gnorm)
             if gnorm < self.EPS: break
-            direction = -H @ dx
-            alpha = self._line_search(x, direction)
-            xk = x + alpha * direction
-            dxk = self.grad(xk)
+            with self.stats.phase('linalg'): direction = -H @ dx
+            alpha, xk, fx, dxk = self._step(x, direction, fx, dx)
             d = xk - x
             g = dxk - dx
-            rho = 1. / (g @ d)
-            I = np.eye(len(x))
-            H = (I - rho * np.outer(d, g)) @ H @ (I - rho * np.outer(g, d)) + rho * np.outer(d, d)
+            with self.stats.phase('linalg'):
+                  # оновлення рангу 2 за O(n²): H - rho (d Hgᵀ + Hg dᵀ) + (rho² gᵀHg + rho) d dᵀ
+                dg = g @ d
+                if dg > 0:
+                    rho = 1. / dg
+                    Hg = H @ g
+                    H = H + np.outer(d, (rho * rho * (g @ Hg) + rho) * d - rho * Hg) - np.outer(rho * Hg, d)
             x = xk.copy()
             dx = dxk
             gnorm = LA.norm(dx)
-        return table[-1], pd.DataFrame(table)
+    def _lbfgs(self):
+        '''Метод Бройдена-Флетчера-Гольдфарба-Шанно з обмеженою пам'яттю'''
+        x = np.asarray(self.x, dtype=float)
+        alpha = .0
+        fx = self._fun(x)
+        dx = self._grad(x)
+        gnorm = LA.norm(dx)
+          # історія останніх пар (d, g) у кільцевих буферах
+        m = max(1, self.HISTORY)
+        D = np.empty((m, len(x)))
+        G = np.empty((m, len(x)))
+        rhos = np.empty(m)
+        k = 0
+        for _ in range(self.MAXITER):
+            yield dict(x=x, fun=fx, grad=dx, alpha=alpha, gnorm=gnorm)
+            if gnorm < self.EPS: break
+            with self.stats.phase('linalg'): direction = -self._twoloop(dx, D, G, rhos, k)
+            alpha, xk, fx, dxk = self._step(x, direction, fx, dx, a1=1. if k else 1. / LA.norm(dx, np.inf))
+            d = xk - x
+            g = dxk - dx
+            dg = g @ d
+            if dg > 0:
+                D[k % m] = d
+                G[k % m] = g
+                rhos[k % m] = 1. / dg
+                k += 1
+            x = xk
+            dx = dxk
+            gnorm = LA.norm(dx)
+    def _twoloop(self, dx, D, G, rhos, k:int) -> np.ndarray:
+        '''Добуток H @ dx за двоцикловою рекурсією L-BFGS, O(mn)'''
+        m = len(rhos)
+        idxs = [i % m for i in range(max(0, k - m), k)]
+        q = dx.copy()
+        a = np.empty(m)
+        for i in reversed(idxs):
+            a[i] = rhos[i] * (D[i] @ q)
+            q -= a[i] * G[i]
+        if idxs: q *= (D[idxs[-1]] @ G[idxs[-1]]) / (G[idxs[-1]] @ G[idxs[-1]])
+        for i in idxs:
+            b = rhos[i] * (G[i] @ q)
+            q += (a[i] - b) * D[i]
+        return q
     def _newton(self):
         '''Метод Ньютона'''
         x = np.asarray(self.x, dtype=float)
-        dx = self.grad(x)
-        deltax = -LA.inv(self.hesse(x)) @ dx
+        dx = self._grad(x)
+        H = self._hesse(x)
+        with self.stats.phase('linalg'): deltax = -LA.solve(H, dx)
         gnorm = LA.norm(dx)
-        table = []
         for _ in range(self.MAXITER):
-            table.append({'method':'Ньютона', 'x':x.tolist(), 'fun':float(self.fun(x)), 'grad':dx.tolist(), 'hesse':self.hesse(x).tolist(), 'gnorm':float(gnorm)})
+            yield dict(x=x, fun=self._fun(x), grad=dx, hesse=H, gnorm=gnorm)
             if gnorm < self.EPS: break
-            x += deltax
-            dx = self.grad(x)
-            deltax = -LA.inv(self.hesse(x)) @ dx
+            x = x + deltax
+            dx = self._grad(x)
+            H = self._hesse(x)
+            with self.stats.phase('linalg'): deltax = -LA.solve(H, dx)
             gnorm = LA.norm(dx)
-        return table[-1], pd.DataFrame(table)
     
-    def _line_search(self, x, dx, a0:float=.0, h:float=.002) -> float:
-        '''Лінійний пошук зі зменшенням кроку за квадратичною інтерполяцією'''
+    def _newtonCG(self, gamma:float=.9, power:float=2.):
+        '''Метод Ньютона зі спряженими градієнтами (без матриці Гессе)'''
+        x = np.asarray(self.x, dtype=float)
+        alpha = .0
+        dx = self._grad(x)
+        gnorm = LA.norm(dx)
+        fx = self._fun(x)
+        eta = .5
+        for _ in range(self.MAXITER):
+            yield dict(x=x, fun=fx, grad=dx, alpha=alpha, gnorm=gnorm)
+            if gnorm < self.EPS: break
+            direction = self._cg(x, dx, eta * gnorm)
+            alpha, x, fx, dxk = self._step(x, direction, fx, dx)
+            gnormk = LA.norm(dxk)
+              # параметр точності внутрішніх ітерацій (Айзенштат-Уокер, вибір 2)
+            etak = gamma * (gnormk / gnorm) ** power
+            if gamma * eta ** power > .1: etak = max(etak, gamma * eta ** power)
+            eta = min(etak, .9)
+            dx = dxk
+            gnorm = gnormk
+    def _cg(self, x, dx, tol:float) -> np.ndarray:
+        '''Наближений розв'язок ∇²f p = -∇f спряженими градієнтами до |r| <= tol'''
+        p = np.zeros_like(x)
+        r = -dx
+        d = r.copy()
+        rr = r @ r
+        for _ in range(2 * len(x)):
+            Hd = self._hessp(x, d, dx)
+            with self.stats.phase('linalg'):
+                dHd = d @ Hd
+                  # від'ємна кривина: повертається поточний напрям (або антиградієнт)
+                if dHd <= 0: return p if p.any() else -dx
+                a = rr / dHd
+                p += a * d
+                r -= a * Hd
+                rrk = r @ r
+                if np.sqrt(rrk) <= tol: break
+                d = r + (rrk / rr) * d
+                rr = rrk
+        return p
+    
+    def _step(self, x, direction, fx:float, dx, a1:float=1., c2:float=.9) -> tuple:
+        '''Крок уздовж напряму: alpha, нова точка, значення функції і градієнт у ній'''
+        alpha, fk, dxk = self._line_search(x, direction, fx, dx, a1, c2)
+        xk = x + alpha * direction
+        if fk is None: fk = self._fun(xk)
+        if dxk is None: dxk = self._grad(xk)
+        return alpha, xk, fk, dxk
+    def _line_search(self, x, dx, fx:float=None, gx=None, a1:float=1., c2:float=.9) -> tuple:
+        '''Лінійний пошук (self.linesearch): alpha, f і ∇f у новій точці (None, якщо не обчислені)'''
+        with self.stats.phase('linesearch'):
+            match self.linesearch:
+                case 'quadratic': return self._quadratic_search(x, dx, .0, .002), None, None
+                case 'wolfe': return self._wolfe_search(x, dx, fx, gx, a1, c2=c2)
+                case _: raise Exception(f'! Неправильне введення лінійного пошуку "{self.linesearch}" !')
+    def _wolfe_search(self, x, dx, fx:float, gx, a1:float=1., c1:float=1e-4, c2:float=.9) -> tuple:
+        '''Пошук кроку за сильними умовами Вольфе з кубічною інтерполяцією'''
+        def phi(a) -> tuple:
+            y = x + a * dx
+            fy = self._fun(y)
+            gy = self._grad(y)
+            return fy, gy, gy @ dx
+        
+        if fx is None: fx = self._fun(x)
+        if gx is None: gx = self._grad(x)
+        dphi0 = gx @ dx
+        if dphi0 >= 0: return .0, fx, gx
+        prev = (.0, fx, dphi0, gx)
+        a = a1 if a1 > 0 and np.isfinite(a1) else 1.
+        for i in range(self.MAXITER):
+            fa, ga, dphia = phi(a)
+            if fa > fx + c1 * a * dphi0 or (i > 0 and fa >= prev[1]):
+                return self._zoom(phi, fx, dphi0, prev, (a, fa, dphia, ga), c1, c2)
+            if abs(dphia) <= -c2 * dphi0: return a, fa, ga
+            if dphia >= 0:
+                return self._zoom(phi, fx, dphi0, (a, fa, dphia, ga), prev, c1, c2)
+            prev = (a, fa, dphia, ga)
+            a *= 2
+        return prev[0], prev[1], prev[3]
+    def _zoom(self, phi:callable, fx:float, dphi0:float, lo:tuple, hi:tuple, c1:float, c2:float) -> tuple:
+        '''Звуження інтервалу [lo, hi] (a, f, f', ∇f) з кубічною інтерполяцією'''
+        for _ in range(self.MAXITER):
+            alo, flo, dlo, _ = lo
+            ahi, fhi, dhi, _ = hi
+              # мінімум кубічного інтерполянта з запобіжником біля кінців інтервалу
+            d1 = dlo + dhi - 3 * (flo - fhi) / (alo - ahi)
+            d2 = d1 * d1 - dlo * dhi
+            a = None
+            if d2 >= 0:
+                d2 = np.copysign(np.sqrt(d2), ahi - alo)
+                denom = dhi - dlo + 2 * d2
+                if denom != 0: a = ahi - (ahi - alo) * (dhi + d2 - d1) / denom
+            low, high = min(alo, ahi), max(alo, ahi)
+            margin = .1 * (high - low)
+            if a is None or not np.isfinite(a) or not low + margin <= a <= high - margin: a = (alo + ahi) / 2
+            if high - low < np.finfo(float).eps * max(1., high): break
+            fa, ga, dphia = phi(a)
+            if fa > fx + c1 * a * dphi0 or fa >= flo:
+                hi = (a, fa, dphia, ga)
+            else:
+                if abs(dphia) <= -c2 * dphi0: return a, fa, ga
+                if dphia * (ahi - alo) >= 0: hi = lo
+                lo = (a, fa, dphia, ga)
+        return lo[0], lo[1], lo[3]
+    def _quadratic_search(self, x, dx, a0:float, h:float) -> float:
+        '''Пошук мінімуму phi(a) = fun(x + a * dx) з розширенням кроку і квадратичною інтерполяцією'''
         def phi(y) -> float:
-            return self.fun(x + y * dx)
+            return self._fun(x + y * dx)
+        def phis(ys) -> np.ndarray:
+            return self._funs(x + np.outer(ys, dx))
         
-        if phi(a0) < phi(a0 + h):
+          # кількість кандидатів подвоєння кроку за один виклик
+        k = 8 if self.vectorized else 1
+        fa0, fa0h = phis((a0, a0 + h))
+        if fa0 < fa0h:
             h = -h
-        while phi(a0) > phi(a0 + h):
+            fa0h = phi(a0 + h)
+        fprev = None
+        fqueue = []
+        while fa0 > fa0h:
+            fprev, fa0 = fa0, fa0h
             a0 += h
             h *= 2
+              # кандидати a0 + h, a0 + 3h, a0 + 7h, ... (наступні подвоєння кроку)
+            if not fqueue: fqueue = list(phis(a0 + h * (2. ** np.arange(1, k + 1) - 1)))
+            fa0h = fqueue.pop(0)
         alpha, beta, gamma = .0, .0, .0
-        if phi(a0) > phi(a0 + h / 2):
-            alpha = a0
-            beta = a0 + h / 2
-            gamma = a0 + h
+        fmid = phi(a0 + h / 2)
+        if fa0 > fmid:
+            alpha, falpha = a0, fa0
+            beta, fbeta = a0 + h / 2, fmid
+            gamma, fgamma = a0 + h, fa0h
         else:
-            alpha = a0 - h / 2
-            beta = a0
-            gamma = a0 + h / 2
-        falpha = phi(alpha)
-        fbeta = phi(beta)
-        fgamma = phi(gamma)
+            alpha, falpha = a0 - h / 2, fprev if fprev is not None else phi(a0 - h / 2)
+            beta, fbeta = a0, fa0
+            gamma, fgamma = a0 + h / 2, fmid
         delta = .0
         fdelta = .0
         for _ in range(self.MAXITER):
@@ -250,3 +740,27 @@ class UMO:
                     falpha = fbeta
                     fbeta = fdelta
         return delta
+
+
+
+_UMO = None
+_STOP = None
+
+def _context():
+    '''Контекст процесів без fork: процес, що викликає (наприклад, інтерфейс з фоновими потоками), може мати інші потоки'''
+    import multiprocessing
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def _initialize(umo:UMO, stop=None):
+    '''Копія UMO (і подія зупинки) в процесі пулу (передається один раз)'''
+    global _UMO, _STOP
+    _UMO, _STOP = umo, stop
+
+def _solve(method:str, x:tuple) -> dict:
+    '''Розв'язок з початкової точки x у процесі пулу'''
+    return _UMO.run(method, x, stop=_STOP).result | {'start':list(x)}
+
+def _race(method:str) -> dict:
+    '''Розв'язок методом у процесі пулу -> рядок таблиці порівняння'''
+    run = _UMO.run(method, stop=_STOP)
+    return {key:run.result[key] for key in ('method', 'x', 'fun', 'nit', 'nfev', 'ngev', 'nhev', 'wall')} | {'converged':not run.stopped and run.result['nit'] < run.MAXITER}
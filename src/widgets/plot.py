@@ -1,3 +1,4 @@
+import numpy as np
 from customtkinter import *
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -11,18 +12,34 @@ from src.ui import *
 class Plotview(CTkTabview):
     '''
     *Віджет відображення графіків*
+    
+    Полотно видимої вкладки малюється одразу, а приховані вкладки позначаються застарілими (Dirty)
+    і малюються (разом з відкладеними конторами Pending) лише при виборі вкладки.
+    Акцент ітерації та лінія ходу розв'язку (animated) накладаються на збережений фон полотна (Backgrounds) без перемальовування фігури.
     '''
     
     TABS = ('Заповнений', 'Об\'ємний', 'Плоский')
+    
+    DECIMATE = 1000  # найбільша кількість ітерацій на лінії маршруту
 
     def __init__(self, master, ui:UI, x, y, z, tabset:str=None, width = 300, height = 250, corner_radius = None, border_width = None, bg_color = "transparent", fg_color = None, border_color = None, segmented_button_fg_color = None, segmented_button_selected_color = None, segmented_button_selected_hover_color = None, segmented_button_unselected_color = None, segmented_button_unselected_hover_color = None, text_color = None, text_color_disabled = None, command = None, anchor = "center", state = "normal", **kwargs):
         '''
         *Віджет відображення графіків*
         '''
-        super().__init__(master, width, height, corner_radius, border_width, bg_color, fg_color, border_color, segmented_button_fg_color, segmented_button_selected_color, segmented_button_selected_hover_color, segmented_button_unselected_color, segmented_button_unselected_hover_color, text_color, text_color_disabled, command, anchor, state, **kwargs)
+        self.Dirty = {}
+        self.Pending = {}
+        self._on_select = command
+        super().__init__(master, width, height, corner_radius, border_width, bg_color, fg_color, border_color, segmented_button_fg_color, segmented_button_selected_color, segmented_button_selected_hover_color, segmented_button_unselected_color, segmented_button_unselected_hover_color, text_color, text_color_disabled, self._selected, anchor, state, **kwargs)
         self.ui = ui
         self.accent = None
 
+        self.Routes = {}
+        self.Accents = {}
+        self.Streams = {}
+        self._stream = None
+        self.Backgrounds = {}
+        self.Blits = set()
+        self._route = None
         self.Figures = {}
         self.Plots = {}
         self.Canvases = {}
@@ -36,25 +53,41 @@ class Plotview(CTkTabview):
             self.Plots[tab] = None
             self.Canvases[tab] = None
             self.CanvasWidgets[tab] = None
+            self.Dirty[tab] = False
             self._buildTab(tab, x, y, z)
         self.set(tabset if tabset else self.TABS[0])
 
+    def set(self, name:str):
+        '''Вибір вкладки (з малюванням застарілого полотна)'''
+        super().set(name)
+        self.render(name)
+    def render(self, tab:str):
+        '''Малювання полотна вкладки, якщо воно застаріле'''
+        if tab not in self.Dirty: return
+        if tab in self.Pending:
+            self.contour(tab, *self.Pending.pop(tab))
+            self.cmap(tab)
+            self.Dirty[tab] = True
+        if self.Dirty[tab]:
+            self.Canvases[tab].draw()
+            self.Dirty[tab] = False
+        elif tab in self.Blits: self._blit(tab)
     def draw(self):
-        '''Малювання полотен'''
+        '''Малювання полотен: видиме - одразу, приховані - при виборі вкладки'''
         for tab in self.TABS:
-            self.Canvases[tab].draw()
+            self.Dirty[tab] = True
+        self.render(self.get())
     def plot(self, x, y, z):
-        '''Малювання функції'''
+        '''Малювання функції (на прихованих вкладках - відкладене)'''
         for tab in self.TABS:
-            self.contour(tab, x, y, z)
-            self.cmap(tab)
-            self.Canvases[tab].draw()
+            self.Pending[tab] = (x, y, z)
+        self.draw()
     def recover(self):
         '''Відновлення віджету'''
         for tab in self.TABS:
             self.paint(tab)
-            self.Canvases[tab].draw()
-    def clear(self):
+        self.draw()
+    def clear(self, is_draw=True):
         '''Очищення точок, ліній полотен'''
         for tab in self.TABS:
               # точки
@@ -63,80 +96,66 @@ class Plotview(CTkTabview):
               # лінії
             for line in self.Plots[tab].lines:
                 line.remove()
-        self.draw()
+        self.Routes = {}
+        self.Accents = {}
+        self.Streams = {}
+        self._stream = None
+        self._route = None
+        if is_draw: self.draw()
     
-    def dot(self, x, z, color:str=None, is_accent=False):
-        '''Малювання точки'''
-        if not color: color = self.ui.DOT_ACCENT() if is_accent else self.ui.DOT()
-        marker = 'X' if is_accent else '.'
-        for tab in self.TABS:
-            match tab:
-                case 'Плоский' | 'Заповнений':
-                    self.Plots[tab].scatter(x[0], x[1], color=color, marker=marker, s=75 if is_accent else 25, zorder=31)
-                case 'Об\'ємний':
-                    self.Plots[tab].scatter(x[0], x[1], z, color=color, marker=marker, s=75 if is_accent else 25, zorder=31, depthshade=False)
-    def line(self, x0, z0, x1, z1, is_accent=False):
-        '''Малювання лінії'''
-        color = self.ui.LINE_ACCENT() if is_accent else self.ui.LINE()
-        linewidth = 3 if is_accent else 2
-        zorder = 11 if is_accent else 10
+    def stream(self, states:list):
+        '''Продовження лінії ходу розв'язку новими ітераціями (одна лінія на вкладку, накладається на фон)'''
+        points = np.array([(state['x'][0], state['x'][1], state['fun']) for state in states], dtype=float)
+        if self._stream is None:
+            self._stream = points
+              # симплексні методи - лише точки, інші - лінія
+            linestyle = '' if 'simplex' in states[0] else '-'
+            for tab in self.TABS:
+                xyz = points.T if tab == 'Об\'ємний' else points.T[:2]
+                self.Streams[tab] = self.Plots[tab].plot(*xyz[:, :0], c=self.ui.LINE(), marker='.', ms=10, mfc=self.ui.DOT(), mec=self.ui.DOT(), ls=linestyle, lw=2, zorder=10, animated=True)[0]
+        else: self._stream = np.concatenate((self._stream, points))
         for tab in self.TABS:
-            match tab:
-                case 'Плоский' | 'Заповнений':
-                    self.Plots[tab].plot([x0[0], x1[0]], [x0[1], x1[1]], c=color, marker='.', ms=10, mfc=self.ui.DOT(), lw=linewidth, zorder=zorder)
-                case 'Об\'ємний':
-                    self.Plots[tab].plot([x0[0], x1[0]], [x0[1], x1[1]], [z0, z1], c=color, marker='.', ms=10, mfc=self.ui.DOT(), lw=linewidth)
-    def route(self, path:dict, curloc=None, is_init=True):
-        '''Малювання маршруту'''
-        is_simplex = 'simplex' in path[0]
+            if tab == 'Об\'ємний': self.Streams[tab].set_data_3d(*self._stream.T)
+            else: self.Streams[tab].set_data(*self._stream.T[:2])
+            self.Blits.add(tab)
+        self.render(self.get())
+    def route(self, path:list=None, curloc=None, is_init=True):
+        '''
+        Малювання маршруту: одна лінія на вкладку (симплекси розділені NaN) і акцентована ітерація поверх неї
+        
+        is_init = False лише переносить акцент на ітерацію curloc (індекс або рядок path), O(1).
+        Якщо ітерацій більше за DECIMATE, то лінія маршруту проріджується (акцент - завжди точний).
+        '''
         if is_init:
-            self.clear()
-            self.accent = 0
-            self.dot(path[0]['x'], path[0]['fun'], is_accent=True)
-              # лінії
-            if is_simplex:
-                for loc in path:
-                    is_accent = loc == path[0]
-                    simplex = loc['simplex']
-                    fsimplex = loc['fsimplex']
-                    for i in range(len(simplex) - 1):
-                        self.line(simplex[i], fsimplex[i], simplex[i + 1], fsimplex[i + 1], is_accent=is_accent)
-                    self.line(simplex[-1], fsimplex[-1], simplex[0], fsimplex[0], is_accent=is_accent)
+            self.clear(is_draw=False)
+            points = np.array([(loc['x'][0], loc['x'][1], loc['fun']) for loc in path], dtype=float)
+            polygons = None
+            if 'simplex' in path[0]:
+                m = len(path[0]['fsimplex'])
+                polygons = np.full((len(path), m + 1, 3), np.nan)
+                for i, loc in enumerate(path):
+                    if loc['simplex'] is None: continue
+                    polygons[i, :m, :2] = np.asarray(loc['simplex'], dtype=float)[:, :2]
+                    polygons[i, :m, 2] = loc['fsimplex']
+                polygons[:, m] = polygons[:, 0]
+            self._route = (points, polygons)
+              # проріджування ітерацій
+            index = np.unique(np.linspace(0, len(path) - 1, self.DECIMATE).astype(int)) if len(path) > self.DECIMATE else slice(None)
+            if polygons is None: line = points[index]
             else:
-                for i in range(len(path) - 1):
-                    loc0 = path[i]
-                    loc1 = path[i + 1]
-                    self.line(loc0['x'], loc0['fun'], loc1['x'], loc1['fun'])
-        else:
-            self.accent = path.index(curloc) if curloc else self.accent
+                line = polygons[index]
+                line = np.concatenate((line, np.full((len(line), 1, 3), np.nan)), axis=1).reshape(-1, 3)
             for tab in self.TABS:
-                  # точки
-                dots = [p for p in self.Plots[tab].collections if type(p) in (PathCollection, Path3DCollection)]
-                for dot in dots:
-                    dot.remove()
-                  # лінії
-                lines = self.Plots[tab].lines
-                if is_simplex:
-                    argc = len(curloc['simplex'])
-                    for i in range(0, len(lines), argc):
-                        is_accent = i / 3 == self.accent
-                        for j in range(argc):
-                            line = lines[i + j]
-                            line.set_color(self.ui.LINE_ACCENT() if is_accent else self.ui.LINE())
-                            line.set_linewidth(3 if is_accent else 2)
-                            line.set_markerfacecolor(self.ui.DOT())
-                            if tab in ('Плоский', 'Заповнений'):
-                                line.set_zorder(11 if is_accent else 10)
-                else:
-                    for i, line in zip(range(len(lines)), lines):
-                        is_accent = i+1 == self.accent
-                        line.set_color(self.ui.LINE_ACCENT() if is_accent else self.ui.LINE())
-                        line.set_linewidth(3 if is_accent else 2)
-                        line.set_markerfacecolor(self.ui.DOT())
-                        if tab in ('Плоский', 'Заповнений'):
-                            line.set_zorder(11 if is_accent else 10)
-              # акцентова точка
-            self.dot(curloc['x'], curloc['fun'], is_accent=True)
+                xyz = line.T if tab == 'Об\'ємний' else line.T[:2]
+                self.Routes[tab] = self.Plots[tab].plot(*xyz, c=self.ui.LINE(), marker='.', ms=10, mfc=self.ui.DOT(), lw=2, zorder=10)[0]
+                self.Accents[tab] = (
+                    self.Plots[tab].plot(*xyz[:, :0], c=self.ui.LINE_ACCENT(), marker='.', ms=10, mfc=self.ui.DOT(), lw=3, zorder=11, animated=True)[0],
+                    self.Plots[tab].plot(*xyz[:, :0], c=self.ui.DOT_ACCENT(), marker='X', ms=9, ls='', zorder=31, animated=True)[0])
+                self.Dirty[tab] = True
+            curloc = 0
+        elif self._route is None: return
+        if isinstance(curloc, dict): curloc = path.index(curloc)
+        self._accent(self.accent if curloc is None else curloc)
     def contour(self, tab:str, x, y, z):
         '''Малювання контору, поверхні'''
         for con in [p for p in self.Plots[tab].collections if type(p) in (QuadContourSet, Poly3DCollection)]:
@@ -167,9 +186,12 @@ class Plotview(CTkTabview):
         for dot in [p for p in self.Plots[tab].collections if type(p) in (PathCollection, Path3DCollection)]:
             dot.set_color(self.ui.DOT_ACCENT() if dot.zorder > 20 else self.ui.DOT())
           # лінії
-        lines = self.Plots[tab].lines
-        for i, line in zip(range(len(lines)), lines):
-            line.set_color(self.ui.LINE_ACCENT() if i+1 == self.accent else self.ui.LINE())
+        accent, mark = self.Accents.get(tab, (None, None))
+        for line in self.Plots[tab].lines:
+            if line is mark:
+                line.set_color(self.ui.DOT_ACCENT())
+                continue
+            line.set_color(self.ui.LINE_ACCENT() if line is accent else self.ui.LINE())
             line.set_markerfacecolor(self.ui.DOT())
         
         self.CanvasWidgets[tab].configure(bg=self.ui.BG(), highlightthickness=0)
@@ -183,6 +205,45 @@ class Plotview(CTkTabview):
                 for con in [p for p in self.Plots[tab].collections if type(p) in (QuadContourSet, Poly3DCollection)]:
                     con.set_cmap(self.ui.cmap())
     
+    def _accent(self, i:int):
+        '''Перенесення акценту на ітерацію i (лише дані двох художників на вкладку, видима вкладка - накладанням на фон)'''
+        self.accent = i
+        points, polygons = self._route
+        segment = polygons[i] if polygons is not None else points[max(i - 1, 0):i + 1]
+        for tab in self.TABS:
+            line, mark = self.Accents[tab]
+            if tab == 'Об\'ємний':
+                line.set_data_3d(*segment.T)
+                mark.set_data_3d(*points[i:i + 1].T)
+            else:
+                line.set_data(*segment.T[:2])
+                mark.set_data(*points[i:i + 1].T[:2])
+            self.Blits.add(tab)
+        self.render(self.get())
+    def _blit(self, tab:str):
+        '''Накладання акценту на збережений фон полотна'''
+        self.Blits.discard(tab)
+        if tab not in self.Backgrounds: return
+        canvas = self.Canvases[tab]
+        canvas.restore_region(self.Backgrounds[tab])
+        for artist in self._animated(tab):
+            self.Plots[tab].draw_artist(artist)
+        canvas.blit(self.Figures[tab].bbox)
+    def _drawn(self, tab:str):
+        '''Збереження фону після повного малювання полотна та малювання акценту'''
+        self.Blits.discard(tab)
+        self.Backgrounds[tab] = self.Canvases[tab].copy_from_bbox(self.Figures[tab].bbox)
+        for artist in self._animated(tab):
+            self.Plots[tab].draw_artist(artist)
+    def _animated(self, tab:str) -> tuple:
+        '''Художники, що накладаються на фон: лінія ходу розв'язку, акцент'''
+        return ((self.Streams[tab],) if tab in self.Streams else ()) + self.Accents.get(tab, ())
+    
+    def _selected(self):
+        '''Вибір вкладки користувачем'''
+        self.render(self.get())
+        if self._on_select: self._on_select()
+    
     def _buildTab(self, tab:str, x, y, z):
         '''Побудова вкладки'''
           # фігура
@@ -193,6 +254,7 @@ class Plotview(CTkTabview):
         self.cmap(tab)
           # полотно
         self.Canvases[tab] = FigureCanvasTkAgg(self.Figures[tab], master=self.tab(tab))
+        self.Canvases[tab].mpl_connect('draw_event', lambda event, tab=tab: self._drawn(tab))
         self.Canvases[tab].draw()
         self.CanvasWidgets[tab] = self.Canvases[tab].get_tk_widget()
         self.CanvasWidgets[tab].configure(bg=self.ui.BG(), highlightthickness=0)
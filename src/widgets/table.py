@@ -1,14 +1,24 @@
-import pandas as pd
+import math
+import sys
+from typing import TYPE_CHECKING
 from customtkinter import *
-from PIL import Image
 
 from src.ui import *
 
+if TYPE_CHECKING: import pandas as pd
 
-class Tableview(CTkScrollableFrame):
+
+class Tableview(CTkFrame):
     '''
     *Віджет відображення таблиць*
+    
+    Таблиця ітерацій віртуальна: постійний набір рядків віджетів (не більше, ніж вміщує екран) прив'язується
+    до видимого зрізу ітерацій, а значення клітинок форматуються лише при показі рядка.
     '''
+    
+    HEIGHT = 34  # висота рядка з клітинками CTkEntry, пікселів
+    HEIGHTS = {'simplex':73, 'fsimplex':73, 'hesse':56}  # висота рядка з клітинками CTkTextbox, пікселів
+
     def __init__(self, master, ui:UI, signal:callable=None, width = 600, height = 600, corner_radius = None, border_width = None, bg_color = 'transparent', fg_color = None, border_color = None, background_corner_colors = None, overwrite_preferred_drawing_method = None, **kwargs):
         '''
         *Віджет відображення таблиць*
@@ -18,8 +28,21 @@ class Tableview(CTkScrollableFrame):
         self.signal = signal
 
         self.table = None
+        self.iterations = []
         self.Iter = IntVar(value=0)
         self.tabs = []
+        self.rows = []
+        self.first = 0
+        self.scrollbar = None
+        self._height = self.HEIGHT
+
+        self.grid_propagate(False)
+        self.bind('<Configure>', lambda _: self._fill(self.first))
+        if 'linux' in sys.platform:
+            self.bind_all('<Button-4>', self._wheel, add=True)
+            self.bind_all('<Button-5>', self._wheel, add=True)
+        else:
+            self.bind_all('<MouseWheel>', self._wheel, add=True)
     
     def recover(self):
         '''Відновлення віджету'''
@@ -28,114 +51,189 @@ class Tableview(CTkScrollableFrame):
     def clear(self):
         '''Очищення від клітинок'''
         self.table = None
+        self.iterations = []
         self.tabs = []
+        self.rows = []
+        self.first = 0
+        self.scrollbar = None
         for child in self.winfo_children():
-            child.destroy()
+            if child is not self._canvas: child.destroy()
     
     def iteration(self) -> dict:
         '''Поточна ітерація'''
-        return self.table.iloc[self.Iter.get()].to_dict()
+        return self.iterations[self.Iter.get()]
 
-    def panda(self, table:pd.DataFrame):
-        '''Побудова таблиці'''
+    def panda(self, table:'pd.DataFrame'):
+        '''Побудова таблиці (віджети - лише для рядків, що вміщуються на екрані)'''
         def on_radio_changed():
             if self.signal: self.signal(self.iteration())
             else: self.iteration()
         def on_next():
-            self.Iter.set((self.Iter.get() + 1) % len(self.table.values))
+            self.Iter.set((self.Iter.get() + 1) % len(self.iterations))
+            self.show(self.Iter.get())
             on_radio_changed()
         
         self.clear()
         self.table = table
-        self._parent_canvas.yview_moveto(0.0)
+        self.iterations = table.to_dict('records')  # рядки таблиці - один раз на розв'язок
           # іконка наступної ітерації
-        next_png = Image.open('icons/next.png')
-        icon = CTkImage(dark_image=next_png, light_image=next_png, size=(15, 15))
-        btn = CTkButton(master=self, command=on_next, image=icon, text='', width=15, height=15)
-        btn.grid(padx=1.6, sticky=W)
-        btn.image = icon
+        CTkButton(master=self, command=on_next, image=icon('next', (15, 15)), text='', width=15, height=15).grid(row=0, column=0, padx=1.6, sticky=W)
         
-        self.tabs = []
           # побудова заголовків
-        for j, key in zip(range(len(self.table.keys())), self.table.keys()):
-            if key == 'method': continue
+        columns = [(j, key) for j, key in enumerate(self.table.keys()) if key != 'method']
+        for j, key in columns:
+            lable, width = self._header(key)
+            self.tabs.append(CTkEntry(master=self, width=width, fg_color=self.ui.BG_ACCENT(), text_color=self.ui.FG_SHADOW()))
+            self.tabs[-1].grid(row=0, column=j)
+            self.tabs[-1].insert(0, lable)
+            self.tabs[-1].configure(state=DISABLED)
+          # побудова рядків віджетів (клітинки заповнюються в _fill)
+        self._height = max(self.HEIGHTS.get(key, self.HEIGHT) for _, key in columns)
+        for i in range(min(len(self.iterations), math.ceil(self.winfo_screenheight() / self._apply_widget_scaling(self._height)))):
+            radio = CTkRadioButton(master=self, value=i, variable=self.Iter, command=on_radio_changed, text=f'{i}', width=40, height=20, radiobutton_width=15, radiobutton_height=15)
+            radio.grid(row=i+1, column=0, padx=6, pady=3, sticky=N)
+            cells = {}
+            for j, key in columns:
+                width = self._header(key)[1]
+                match key:
+                    case 'simplex' | 'fsimplex' | 'hesse':
+                        cells[key] = CTkTextbox(master=self, width=width, height=self.HEIGHTS[key] - 6)
+                    case _:
+                        cells[key] = CTkEntry(master=self, width=width)
+                cells[key].grid(row=i+1, column=j, sticky=N)
+            self.rows.append((radio, cells, [None]))
+          # прокрутка
+        self.scrollbar = CTkScrollbar(master=self, command=self._scroll)
+        self.scrollbar.grid(row=1, column=len(self.table.keys()), rowspan=max(len(self.rows), 1), sticky=NS)
+
+        self._fill(0)
+        self.Iter.set(0)
+        on_radio_changed()
+    def show(self, i:int):
+        '''Прокрутка таблиці до ітерації i (якщо її не видно)'''
+        visible = self._visible()
+        if i < self.first: self._fill(i)
+        elif i >= self.first + visible: self._fill(i - visible + 1)
+    
+    def _visible(self) -> int:
+        '''Кількість рядків, що вміщуються у віджеті'''
+        rows = int(self.winfo_height() // self._apply_widget_scaling(self._height)) - 1
+        return max(1, min(len(self.rows), rows)) if rows > 0 else len(self.rows)
+    def _fill(self, first:int):
+        '''Прив'язка рядків віджетів до ітерацій, починаючи з first (форматуються лише змінені рядки)'''
+        if not self.rows: return
+        visible = self._visible()
+        self.first = max(0, min(first, len(self.iterations) - visible))
+        for i, (radio, cells, bound) in enumerate(self.rows):
+            it = self.first + i
+            if it >= len(self.iterations):
+                radio.grid_remove()
+                for cell in cells.values(): cell.grid_remove()
+                bound[0] = None
+                continue
+            if bound[0] == it: continue
+            if bound[0] is None:
+                radio.grid()
+                for cell in cells.values(): cell.grid()
+            bound[0] = it
+            radio.configure(value=it, text=f'{it}')
+            if self.Iter.get() == it: radio.select(from_variable_callback=True)
+            else: radio.deselect(from_variable_callback=True)
+            for key, cell in cells.items():
+                cell.configure(state=NORMAL)
+                if isinstance(cell, CTkTextbox):
+                    cell.delete('1.0', END)
+                    cell.insert('1.0', self._format(key, self.iterations[it][key]))
+                else:
+                    cell.delete(0, END)
+                    cell.insert(0, self._format(key, self.iterations[it][key]))
+                cell.configure(state=DISABLED)
+        self.scrollbar.set(self.first / len(self.iterations), min(1., (self.first + visible) / len(self.iterations)))
+    def _scroll(self, command:str, value, unit:str=None):
+        '''Прокрутка смугою прокрутки (moveto - частка таблиці, scroll - рядки або сторінки)'''
+        match command:
+            case 'moveto': self._fill(round(float(value) * len(self.iterations)))
+            case 'scroll': self._fill(self.first + int(value) * (self._visible() if unit == 'pages' else 1))
+    def _wheel(self, event):
+        '''Прокрутка колесом миші над таблицею'''
+        if not self.rows or not str(event.widget).startswith(f'{self}.'): return
+        self._fill(self.first + (-1 if event.num == 4 or event.delta > 0 else 1))
+    
+    def _header(self, key:str) -> tuple:
+        '''Заголовок і ширина стовпця'''
+        match key:
+            case 'x': return 'Точка', 130
+            case 'grad': return 'Градієнт', 130
+            case 'fun': return 'Функція', 75
+            case 'simplex': return 'Симплекс', 135
+            case 'fsimplex': return 'Функції симплексу', 80
+            case 'gnorm': return 'Нормаль градієнту', 75
+            case 'hesse': return 'Гессе', 135
+            case 'delta': return 'Крок', 60
+            case 'alpha': return 'Альфа', 60
+            case _: return key, 75
+    def _format(self, key:str, value) -> str:
+        '''Текст клітинки'''
+        if value is None: return ''
+        match key:
+            case 'x' | 'grad':
+                return '\t'.join([f'{v:.3f}' for v in value])
+            case 'simplex' | 'hesse':
+                return '\n'.join(['\t'.join([f'{v:.3f}' for v in vs]) for vs in value])
+            case 'fsimplex':
+                return '\n'.join([f'{v:.3f}' for v in value])
+            case _:
+                return f'{value:.3f}'
+    def report(self, table:'pd.DataFrame'):
+        '''Побудова таблиці порівняння методів'''
+        self.clear()
+        self.table = table
+        
+          # побудова заголовків
+        for j, key in enumerate(self.table.keys()):
             match key:
+                case 'method':
+                    lable = 'Метод'
+                    width = 170
                 case 'x':
                     lable = 'Точка'
                     width = 130
-                case 'grad':
-                    lable = 'Градієнт'
-                    width = 130
                 case 'fun':
                     lable = 'Функція'
                     width = 75
-                case 'simplex':
-                    lable = 'Симплекс'
-                    width = 135
-                case 'fsimplex':
-                    lable = 'Функції симплексу'
-                    width = 80
-                case 'gnorm':
-                    lable = 'Нормаль градієнту'
-                    width = 75
-                case 'hesse':
-                    lable = 'Гессе'
-                    width = 135
-                case 'delta':
-                    lable = 'Крок'
-                    width = 60
-                case 'alpha':
-                    lable = 'Альфа'
+                case 'nit':
+                    lable = 'Ітерацій'
                     width = 60
+                case 'nfev':
+                    lable = 'f'
+                    width = 50
+                case 'ngev':
+                    lable = '∇f'
+                    width = 50
+                case 'nhev':
+                    lable = '∇²f'
+                    width = 50
+                case 'wall':
+                    lable = 'Час, мс'
+                    width = 65
+                case 'converged':
+                    lable = 'Збіжність'
+                    width = 70
             self.tabs.append(CTkEntry(master=self, width=width, fg_color=self.ui.BG_ACCENT(), text_color=self.ui.FG_SHADOW()))
             self.tabs[-1].grid(row=0, column=j)
             self.tabs[-1].insert(0, lable)
             self.tabs[-1].configure(state=DISABLED)
           # побудова клітинок
         for i, row in self.table.iterrows():
-            CTkRadioButton(master=self, value=i, variable=self.Iter, command=on_radio_changed, text=f'{i}', width=40, height=20, radiobutton_width=15, radiobutton_height=15).grid(row=i+1, column=0, padx=6, pady=3, sticky=N)
-            for j, value in zip(range(len(row)), row):
-                if type(value) is str: continue
-                match self.table.keys()[j]:
-                    case 'x' | 'grad':
-                        width = 130
-                        val = '\t'.join([f'{v:.3f}' for v in value])
-                    case 'fun' | 'gnorm':
-                        width = 75
-                        val = f'{value:.3f}'
-                    case 'simplex':
-                        width = 135
-                        val = f'{'\n'.join(['\t'.join([f'{v:.3f}' for v in vs]) for vs in value])}'
-                        txbxv = CTkTextbox(master=self, width=width, height=67)
-                        txbxv.grid(row=i+1, column=j, sticky=N)
-                        txbxv.insert('1.0', val)
-                        txbxv.configure(state=DISABLED)
-                        continue
-                    case 'fsimplex':
-                        width = 80
-                        val = '\n'.join([f'{v:.3f}' for v in value])
-                        txbxv = CTkTextbox(master=self, width=width, height=67)
-                        txbxv.grid(row=i+1, column=j, sticky=N)
-                        txbxv.insert('1.0', val)
-                        txbxv.configure(state=DISABLED)
-                        continue
-                    case 'hesse':
-                        width = 135
-                        val = [v for vv in value for v in vv]
-                        val = '\t'.join([f'{v:.3f}' for v in val])
-                        val = f'{'\t'.join([f'{v:.3f}' for v in value[0]])}\n{'\t'.join([f'{v:.3f}' for v in value[1]])}'
-                        txbxv = CTkTextbox(master=self, width=width, height=50)
-                        txbxv.grid(row=i+1, column=j, sticky=N)
-                        txbxv.insert('1.0', val)
-                        txbxv.configure(state=DISABLED)
-                        continue
-                    case 'alpha' | 'delta':
-                        width = 60
-                        val = f'{value:.3f}'
-                entv = CTkEntry(master=self, width=width)
+            for j, (key, value) in enumerate(row.items()):
+                match key:
+                    case 'method': val = value
+                    case 'x': val = '\t'.join([f'{v:.3f}' for v in value])
+                    case 'fun': val = f'{value:.3f}'
+                    case 'wall': val = f'{1e3 * value:.1f}'
+                    case 'converged': val = '✓' if value else '✗'
+                    case _: val = f'{value}'
+                entv = CTkEntry(master=self, width=self.tabs[j].cget('width'))
                 entv.grid(row=i+1, column=j, sticky=N)
                 entv.insert(0, val)
                 entv.configure(state=DISABLED)
-
-        self.Iter.set(0)
-        on_radio_changed()
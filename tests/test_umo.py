@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from src.umo import UMO
+
+
+def ellipse(x):
+    return x[0] ** 2 + 2 * x[1] ** 2
+
+
+@pytest.mark.parametrize('method', ('Нелдера-Міда', 'Нелдера-Міда (паралельний)'))
+def test_neldermead_level_set(method):
+      # з (1, 1) симплекс рано лягає на лінію рівня: розкид значень малий, а мінімум далеко
+    umo = UMO(ellipse, (1., 1.))
+    umo.solve(method)
+    assert umo.result['nit'] > 4
+    assert umo.result['fun'] < 1e-3
+    assert np.allclose(umo.result['x'], 0, atol=1e-2)
+
+
+def test_newtoncg_hessp_counts():
+      # різниці градієнтів рахуються як ngev, а не nhev; пробні точки не займають кеш градієнта
+    grad = lambda x: np.array((2 * x[0], 4 * x[1]))
+    umo = UMO(ellipse, (1., 1.), grad=grad, cache=16, linesearch='wolfe')
+    umo.solve('Ньютона-CG')
+    assert umo.result['nhev'] == 0
+    assert umo.cacheInfo()['grad'].currsize <= umo.result['nit'] + 1
+    umo = UMO(ellipse, (1., 1.), grad=grad, hessp=lambda x, v: np.array((2 * v[0], 4 * v[1])), linesearch='wolfe')
+    umo.solve('Ньютона-CG')
+    assert umo.result['nhev'] > 0
+
+
+def test_complex_step_non_analytic():
+      # комплексний крок не бачить похідної abs: градієнт мовчки нульовий, центральні різниці - правильні
+    fun = lambda x: np.abs(x[0]) + x[1] ** 2
+    x = np.array((-1., 1.))
+    assert np.allclose(UMO(fun, diff='central')._grad(x), (-1., 2.))
+    assert np.allclose(UMO(fun, diff='complex')._grad(x), (0., 2.))